@@ -14,12 +14,21 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
 import threading
 
+from job_logs import JobLogStore
+from daily_stats import DailyStatsStore
+from change_counters import ChangeCounters
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class BroadcastService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, job_logs: Optional[JobLogStore] = None,
+                 daily_stats: Optional[DailyStatsStore] = None,
+                 change_counters: Optional[ChangeCounters] = None):
         self.db = db
+        self.job_logs = job_logs or JobLogStore(db)
+        self.daily_stats = daily_stats or DailyStatsStore(db)
+        self.change_counters = change_counters or ChangeCounters(db)
         self.active_broadcasts = {}
         self.drivers = {}  # Хранение драйверов для каждого аккаунта
         self.locks = {}    # Блокировки для каждого аккаунта
@@ -110,11 +119,12 @@ class BroadcastService:
                 {
                     "$set": {
                         "status": "running",
-                        "started_at": datetime.utcnow(),
-                        "logs": [f"Начало рассылки в {datetime.now().strftime('%H:%M:%S')}"]
+                        "started_at": datetime.utcnow()
                     }
                 }
             )
+            await self.change_counters.bump(user_id, "jobs")
+            await self._log_broadcast(job_id, f"Начало рассылки в {datetime.now().strftime('%H:%M:%S')}")
 
             # Получаем драйвер для аккаунта
             driver = await self.get_account_driver(account_id, platform)
@@ -124,11 +134,11 @@ class BroadcastService:
             
             if platform == 'whatsapp':
                 success = await self._send_whatsapp_broadcast(
-                    job_id, driver, recipients, templates, template_mode
+                    job_id, user_id, driver, recipients, templates, template_mode
                 )
             elif platform == 'telegram':
                 success = await self._send_telegram_broadcast(
-                    job_id, driver, recipients, templates, template_mode
+                    job_id, user_id, driver, recipients, templates, template_mode
                 )
             else:
                 raise ValueError(f"Unsupported platform: {platform}")
@@ -141,12 +151,11 @@ class BroadcastService:
                     "$set": {
                         "status": final_status,
                         "completed_at": datetime.utcnow()
-                    },
-                    "$push": {
-                        "logs": f"Рассылка завершена со статусом: {final_status}"
                     }
                 }
             )
+            await self.change_counters.bump(user_id, "jobs")
+            await self._log_broadcast(job_id, f"Рассылка завершена со статусом: {final_status}")
 
             return success
 
@@ -154,17 +163,16 @@ class BroadcastService:
             logger.error(f"Broadcast error for job {job_id}: {str(e)}")
             await self.db.broadcast_jobs.update_one(
                 {"id": job_id},
-                {
-                    "$set": {"status": "failed", "completed_at": datetime.utcnow()},
-                    "$push": {"logs": f"Ошибка: {str(e)}"}
-                }
+                {"$set": {"status": "failed", "completed_at": datetime.utcnow()}}
             )
+            await self.change_counters.bump(user_id, "jobs")
+            await self._log_broadcast(job_id, f"Ошибка: {str(e)}")
             return False
         finally:
             if job_id in self.active_broadcasts:
                 del self.active_broadcasts[job_id]
 
-    async def _send_whatsapp_broadcast(self, job_id: str, driver: webdriver.Chrome, 
+    async def _send_whatsapp_broadcast(self, job_id: str, user_id: str, driver: webdriver.Chrome, 
                                      recipients: List[Dict], templates: List[str], 
                                      template_mode: str) -> bool:
         """Рассылка через WhatsApp"""
@@ -176,6 +184,7 @@ class BroadcastService:
                 if job_id not in self.active_broadcasts:
                     break  # Остановка рассылки
                 
+                recorded = False
                 try:
                     phone = recipient['contact_info']
                     # Выбираем шаблон
@@ -186,6 +195,10 @@ class BroadcastService:
                     
                     success = await self._send_whatsapp_message(driver, phone, message, job_id)
                     
+                    # Обновляем прогресс
+                    await self._record_send(job_id, user_id, success)
+                    recorded = True
+                    
                     if success:
                         successful_sends += 1
                         await self._log_broadcast(job_id, f"✅ Отправлено: {phone}")
@@ -193,22 +206,13 @@ class BroadcastService:
                         failed_sends += 1
                         await self._log_broadcast(job_id, f"❌ Ошибка: {phone}")
                     
-                    # Обновляем прогресс
-                    await self.db.broadcast_jobs.update_one(
-                        {"id": job_id},
-                        {
-                            "$set": {
-                                "successful_sends": successful_sends,
-                                "failed_sends": failed_sends
-                            }
-                        }
-                    )
-                    
                     # Пауза между сообщениями
                     await asyncio.sleep(random.uniform(3, 7))
                     
                 except Exception as e:
                     failed_sends += 1
+                    if not recorded:
+                        await self._record_send(job_id, user_id, False)
                     await self._log_broadcast(job_id, f"❌ Критическая ошибка для {recipient.get('contact_info', 'unknown')}: {str(e)}")
         
         return successful_sends > 0
@@ -276,7 +280,7 @@ class BroadcastService:
             logger.error(f"WhatsApp send error for {phone}: {str(e)}")
             return False
 
-    async def _send_telegram_broadcast(self, job_id: str, driver: webdriver.Chrome, 
+    async def _send_telegram_broadcast(self, job_id: str, user_id: str, driver: webdriver.Chrome, 
                                      recipients: List[Dict], templates: List[str], 
                                      template_mode: str) -> bool:
         """Рассылка через Telegram"""
@@ -288,6 +292,7 @@ class BroadcastService:
                 if job_id not in self.active_broadcasts:
                     break
                 
+                recorded = False
                 try:
                     username = recipient['contact_info']
                     # Выбираем шаблон
@@ -298,6 +303,10 @@ class BroadcastService:
                     
                     success = await self._send_telegram_message(driver, username, message, job_id)
                     
+                    # Обновляем прогресс
+                    await self._record_send(job_id, user_id, success)
+                    recorded = True
+                    
                     if success:
                         successful_sends += 1
                         await self._log_broadcast(job_id, f"✅ Отправлено: {username}")
@@ -305,22 +314,13 @@ class BroadcastService:
                         failed_sends += 1
                         await self._log_broadcast(job_id, f"❌ Ошибка: {username}")
                     
-                    # Обновляем прогресс
-                    await self.db.broadcast_jobs.update_one(
-                        {"id": job_id},
-                        {
-                            "$set": {
-                                "successful_sends": successful_sends,
-                                "failed_sends": failed_sends
-                            }
-                        }
-                    )
-                    
                     # Пауза между сообщениями
                     await asyncio.sleep(random.uniform(2, 5))
                     
                 except Exception as e:
                     failed_sends += 1
+                    if not recorded:
+                        await self._record_send(job_id, user_id, False)
                     await self._log_broadcast(job_id, f"❌ Критическая ошибка для {recipient.get('contact_info', 'unknown')}: {str(e)}")
         
         return successful_sends > 0
@@ -402,15 +402,24 @@ class BroadcastService:
             except:
                 pass
 
+    async def _record_send(self, job_id: str, user_id: str, success: bool):
+        """Увеличить счётчики задания и дневную статистику пользователя"""
+        successful, failed = (1, 0) if success else (0, 1)
+        await asyncio.gather(
+            self.db.broadcast_jobs.update_one(
+                {"id": job_id},
+                {"$inc": {"successful_sends": successful, "failed_sends": failed}}
+            ),
+            self.daily_stats.increment(user_id, successful=successful, failed=failed),
+            self.change_counters.bump(user_id, "jobs")
+        )
+
     async def _log_broadcast(self, job_id: str, message: str):
         """Добавить лог к заданию"""
         timestamp = datetime.now().strftime('%H:%M:%S')
         log_message = f"[{timestamp}] {message}"
         
-        await self.db.broadcast_jobs.update_one(
-            {"id": job_id},
-            {"$push": {"logs": log_message}}
-        )
+        await self.job_logs.append(job_id, log_message)
         
         logger.info(f"Job {job_id}: {log_message}")
 
@@ -419,13 +428,14 @@ class BroadcastService:
         if job_id in self.active_broadcasts:
             del self.active_broadcasts[job_id]
             
-            await self.db.broadcast_jobs.update_one(
+            job = await self.db.broadcast_jobs.find_one_and_update(
                 {"id": job_id},
-                {
-                    "$set": {"status": "paused", "completed_at": datetime.utcnow()},
-                    "$push": {"logs": "Рассылка остановлена пользователем"}
-                }
+                {"$set": {"status": "paused", "completed_at": datetime.utcnow()}},
+                projection={"_id": 0, "user_id": 1}
             )
+            if job:
+                await self.change_counters.bump(job["user_id"], "jobs")
+            await self._log_broadcast(job_id, "Рассылка остановлена пользователем")
             return True
         return False
 
@@ -0,0 +1,171 @@
+import asyncio
+import functools
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+from starlette.responses import Response, StreamingResponse
+
+from responses import etag_matches, not_modified
+
+
+class TTLCache:
+    """Size-bounded in-process LRU cache whose entries expire after a TTL.
+
+    The cache is local to one worker process, so entries may be stale for up
+    to ``ttl`` seconds after another process changes the underlying data.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ``ttl`` overrides the cache-wide TTL for this entry."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResponseCache:
+    """Short-lived per-user cache of endpoint responses with single-flight misses.
+
+    Concurrent misses on the same key share one computation. invalidate_user()
+    gives the user a new, never reused generation that is part of every key,
+    so all of their entries are dropped in O(1). A generation is forgotten
+    once ``ttl`` has passed since it was set: every entry keyed without it
+    was stored before that and has expired by then.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # user_id -> (generation, set at), oldest first
+        self._generations: "OrderedDict[str, tuple]" = OrderedDict()
+        self._next_generation = itertools.count(1)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def key(self, namespace: str, user_id: str, *parts: Hashable) -> Hashable:
+        generation, _ = self._generations.get(user_id, (0, None))
+        return (namespace, user_id, generation) + parts
+
+    def invalidate_user(self, user_id: str) -> None:
+        now = time.monotonic()
+        self._generations.pop(user_id, None)
+        self._generations[user_id] = (next(self._next_generation), now)
+        while self._generations:
+            oldest_user, (_, set_at) = next(iter(self._generations.items()))
+            if set_at + self.ttl > now:
+                break
+            del self._generations[oldest_user]
+
+    def get(self, key: Hashable) -> Any:
+        return self._cache.get(key)
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Callable[[Any], bool] = lambda value: True,
+                             flight_key: Optional[Hashable] = None) -> Any:
+        """Cached value for ``key``, computing it once for all concurrent callers.
+
+        ``flight_key`` (default ``key``) selects which in-flight computation to
+        join, for results that depend on more than the cache key.
+        """
+        value = self._cache.get(key)
+        if value is not None:
+            return value
+        flight_key = key if flight_key is None else flight_key
+        inflight = self._inflight.get(flight_key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The computing request was cancelled (client went away); retry
+                return await self.get_or_compute(key, compute, cacheable, flight_key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if cacheable(value):
+                self._cache.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(flight_key, None)
+
+
+def _cacheable_response(value: Any) -> bool:
+    return (isinstance(value, Response) and not isinstance(value, StreamingResponse)
+            and value.status_code == 200)
+
+
+def cached_response(cache: ResponseCache, namespace: str, vary: Iterable[str] = (),
+                    vary_headers: Iterable[str] = ()):
+    """Cache a route's 200 responses per ``current_user``, ``vary`` params and ``vary_headers``.
+
+    The route must take ``current_user`` and return a complete Response;
+    streaming responses are passed through uncached. Header variation needs
+    the route to take ``request``. A cache hit whose ETag matches
+    If-None-Match is answered with 304.
+    """
+    vary = tuple(vary)
+    vary_headers = tuple(vary_headers)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.get("request")
+            parts = [kwargs.get(name) for name in vary]
+            if request is not None:
+                parts.extend(request.headers.get(name) for name in vary_headers)
+            key = cache.key(namespace, kwargs["current_user"].id, *parts)
+            cached = cache.get(key)
+            if cached is not None:
+                etag = cached.headers.get("etag")
+                if request is not None and etag and etag_matches(request, etag):
+                    return not_modified(etag)
+                return cached
+            # A leader answering 304 must not be shared with requests lacking that ETag
+            if_none_match = request.headers.get("if-none-match") if request is not None else None
+            return await cache.get_or_compute(
+                key, lambda: func(*args, **kwargs), _cacheable_response, flight_key=(key, if_none_match)
+            )
+        return wrapper
+    return decorator
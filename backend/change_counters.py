@@ -0,0 +1,38 @@
+from typing import Callable, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+SCOPES = ("accounts", "jobs")
+
+
+class ChangeCounters:
+    """Per-user version counters, bumped on every write that changes what a user sees.
+
+    Read endpoints derive ETags from them, so a conditional GET costs one
+    small indexed read. Writes that bypass the API and BroadcastService (for
+    example manual database edits) must call bump() themselves or clients may
+    keep a stale 304.
+
+    Callbacks added with on_bump() run in-process after every bump, e.g. to
+    drop cached responses; other workers only see the new counter values.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.user_versions
+        self._listeners: List[Callable[[str], None]] = []
+
+    def on_bump(self, callback: Callable[[str], None]) -> None:
+        self._listeners.append(callback)
+
+    async def bump(self, user_id: str, *scopes: str) -> None:
+        await self.collection.update_one(
+            {"user_id": user_id},
+            {"$inc": {scope: 1 for scope in scopes}},
+            upsert=True,
+        )
+        for callback in self._listeners:
+            callback(user_id)
+
+    async def get(self, user_id: str) -> Dict[str, int]:
+        doc = await self.collection.find_one({"user_id": user_id}, {"_id": 0, "user_id": 0}) or {}
+        return {scope: doc.get(scope, 0) for scope in SCOPES}
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+class DailyStatsStore:
+    """Per-user, per-day send counters maintained with ``$inc``.
+
+    One small document per ``(user_id, day)`` where ``day`` is the UTC date as
+    ``YYYY-MM-DD``, so reading today's figures or a history series never scans
+    broadcast jobs.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.daily_stats
+
+    @staticmethod
+    def day_key(when: Optional[datetime] = None) -> str:
+        return (when or datetime.utcnow()).strftime("%Y-%m-%d")
+
+    async def increment(self, user_id: str, successful: int = 0, failed: int = 0,
+                        when: Optional[datetime] = None) -> None:
+        await self.collection.update_one(
+            {"user_id": user_id, "day": self.day_key(when)},
+            {"$inc": {"successful": successful, "failed": failed}},
+            upsert=True,
+        )
+
+    async def get_day(self, user_id: str, when: Optional[datetime] = None) -> Dict[str, int]:
+        doc = await self.collection.find_one(
+            {"user_id": user_id, "day": self.day_key(when)},
+            {"_id": 0, "successful": 1, "failed": 1},
+        )
+        return {"successful": doc.get("successful", 0), "failed": doc.get("failed", 0)} if doc else {"successful": 0, "failed": 0}
+
+    async def series(self, user_id: str, days: int) -> List[Dict[str, Any]]:
+        """Counters for the last ``days`` days (oldest first), zero-filled."""
+        today = datetime.utcnow()
+        keys = [self.day_key(today - timedelta(days=offset)) for offset in range(days - 1, -1, -1)]
+        docs = await self.collection.find(
+            {"user_id": user_id, "day": {"$gte": keys[0]}},
+            {"_id": 0, "day": 1, "successful": 1, "failed": 1},
+        ).to_list(days)
+        by_day = {doc["day"]: doc for doc in docs}
+        return [
+            {
+                "day": key,
+                "successful": by_day.get(key, {}).get("successful", 0),
+                "failed": by_day.get(key, {}).get("failed", 0),
+            }
+            for key in keys
+        ]
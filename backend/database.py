@@ -0,0 +1,60 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+@dataclass
+class MongoSettings:
+    """Connection settings for one worker process's Motor client.
+
+    Pool limits are per process: with N workers the server sees up to
+    N * max_pool_size connections. Unset timeouts keep the driver defaults.
+    """
+
+    url: str
+    db_name: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    wait_queue_timeout_ms: Optional[int] = None
+    server_selection_timeout_ms: Optional[int] = None
+    connect_timeout_ms: Optional[int] = None
+    socket_timeout_ms: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        return cls(
+            url=os.environ['MONGO_URL'],
+            db_name=os.environ['DB_NAME'],
+            max_pool_size=int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+            min_pool_size=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+            max_idle_time_ms=_optional_int('MONGO_MAX_IDLE_TIME_MS'),
+            wait_queue_timeout_ms=_optional_int('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+            server_selection_timeout_ms=_optional_int('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+            connect_timeout_ms=_optional_int('MONGO_CONNECT_TIMEOUT_MS'),
+            socket_timeout_ms=_optional_int('MONGO_SOCKET_TIMEOUT_MS'),
+        )
+
+    def client_options(self) -> Dict[str, Any]:
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+
+def create_client(settings: MongoSettings, event_listeners: Sequence[Any] = ()) -> AsyncIOMotorClient:
+    """Create a Motor client; call it in the worker process, after any fork."""
+    return AsyncIOMotorClient(settings.url, event_listeners=list(event_listeners), **settings.client_options())
@@ -0,0 +1,131 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes for every query shape issued by server.py and broadcast_service.py
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "messaging_accounts": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("is_active", ASCENDING)],
+            name="user_active",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="user_created_at_id",
+        ),
+    ],
+    "broadcast_jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING)],
+            name="user_status",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING)],
+            name="user_created_at",
+        ),
+        # Archival pass, see job_archive.py
+        IndexModel(
+            [("status", ASCENDING), ("completed_at", ASCENDING)],
+            name="status_completed_at",
+        ),
+    ],
+    "broadcast_jobs_archive": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING)],
+            name="user_created_at",
+        ),
+    ],
+    "user_versions": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "daily_stats": [
+        IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], name="user_day_unique", unique=True),
+    ],
+}
+
+# Representative queries used to verify that the planner picks an index.
+# Values are placeholders, only the shape matters for the plan.
+QUERY_SHAPES: List[Dict[str, Any]] = [
+    {"collection": "users", "filter": {"email": "probe@example.com"}},
+    {"collection": "users", "filter": {"id": "probe"}},
+    {"collection": "messaging_accounts", "filter": {"user_id": "probe", "is_active": True}},
+    {"collection": "messaging_accounts", "filter": {"user_id": "probe"}, "sort": {"created_at": 1, "id": 1}},
+    {"collection": "broadcast_jobs", "filter": {"id": "probe"}},
+    {"collection": "broadcast_jobs", "filter": {"user_id": "probe", "status": {"$in": ["pending", "running"]}}},
+    {"collection": "user_versions", "filter": {"user_id": "probe"}},
+    {"collection": "daily_stats", "filter": {"user_id": "probe", "day": "1970-01-01"}},
+    {"collection": "daily_stats", "filter": {"user_id": "probe", "day": {"$gte": "1970-01-01"}}},
+    {"collection": "broadcast_jobs", "filter": {"user_id": "probe"}, "sort": {"created_at": -1}},
+    {"collection": "broadcast_jobs", "filter": {
+        "status": {"$in": ["completed", "failed", "paused"]}, "completed_at": {"$lt": "1970-01-01"},
+    }},
+    {"collection": "broadcast_jobs_archive", "filter": {"id": "probe"}},
+]
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create all indexes declared in INDEXES (no-op for existing ones).
+
+    A collection whose indexes cannot be built, e.g. a unique index over
+    existing duplicate emails or ids, is logged and skipped so the worker
+    still starts; clean up the duplicates and restart to create it.
+    """
+    for collection, indexes in INDEXES.items():
+        try:
+            names = await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error(f"Could not create indexes on {collection}: {str(e)}")
+            continue
+        logger.info(f"Ensured indexes on {collection}: {', '.join(names)}")
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    if "inputStage" in plan:
+        stages.extend(_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def find_collscans(db: AsyncIOMotorDatabase,
+                         shapes: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Explain each query shape and return those whose winning plan is a COLLSCAN."""
+    collscans = []
+    for shape in shapes if shapes is not None else QUERY_SHAPES:
+        command = {"find": shape["collection"], "filter": shape["filter"]}
+        if "sort" in shape:
+            command["sort"] = shape["sort"]
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        # Newer servers wrap the classic plan in "queryPlan"
+        winning_plan = winning_plan.get("queryPlan", winning_plan)
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            collscans.append(shape)
+    return collscans
+
+
+async def check_query_plans(db: AsyncIOMotorDatabase) -> None:
+    """Log a warning for every known query shape that falls back to a collection scan."""
+    try:
+        collscans = await find_collscans(db)
+    except Exception as e:
+        logger.warning(f"Query plan check failed: {str(e)}")
+        return
+    for shape in collscans:
+        logger.warning(
+            f"COLLSCAN on {shape['collection']} for filter {shape['filter']}"
+            f"{' sort ' + str(shape['sort']) if 'sort' in shape else ''} - missing index?"
+        )
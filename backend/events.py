@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import orjson
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Fields pushed to clients; other updates (e.g. log_count) produce no event
+WATCHED_FIELDS = {
+    "broadcast_jobs": (
+        "name", "status", "started_at", "completed_at",
+        "total_recipients", "successful_sends", "failed_sends",
+    ),
+    "messaging_accounts": ("platform", "display_name", "is_active"),
+}
+EVENT_TYPES = {"broadcast_jobs": "job", "messaging_accounts": "account"}
+
+# Change streams need a replica set or sharded cluster
+CHANGE_STREAM_UNSUPPORTED = (40573, 40324)
+
+
+class ChangeFeed:
+    """Fans job and account changes out to per-user subscriber queues.
+
+    Uses a database change stream when the server supports it. On a
+    standalone mongod it falls back to polling: the ``user_versions`` change
+    counters of subscribed users are checked every ``poll_interval`` seconds
+    and only users whose counters moved are re-read and diffed.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, poll_interval: float = 2.0,
+                 queue_size: int = 100, recent_jobs: int = 10):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.recent_jobs = recent_jobs
+        self.mode: Optional[str] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Polling state: last seen counters and documents per user
+        self._versions: Dict[str, Dict[str, int]] = {}
+        self._snapshots: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+            self._versions.pop(user_id, None)
+            self._snapshots.pop(user_id, None)
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block the feed
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"Change feed had stopped with an error: {str(e)}")
+            self._task = None
+
+    async def _run(self) -> None:
+        polling = False
+        while True:
+            try:
+                if polling:
+                    self.mode = "polling"
+                    await self._poll()
+                else:
+                    self.mode = "change_stream"
+                    await self._watch()
+            except OperationFailure as e:
+                if not polling and e.code in CHANGE_STREAM_UNSUPPORTED:
+                    logger.info("Change streams unavailable, polling user_versions instead")
+                    polling = True
+                    continue
+                # e.g. ChangeStreamHistoryLost: a fresh stream picks up from now
+                logger.warning(f"Change feed failed: {str(e)}; restarting")
+                await asyncio.sleep(self.poll_interval)
+            except PyMongoError as e:
+                logger.warning(f"Change feed interrupted: {str(e)}; restarting")
+                await asyncio.sleep(self.poll_interval)
+
+    # Change stream mode
+
+    async def _watch(self) -> None:
+        # Filter updates on the watched fields server-side, so updates that
+        # only touch other fields (log_count on every log line) never cost a
+        # full-document lookup.
+        updates = [
+            {
+                "ns.coll": collection,
+                "operationType": "update",
+                "$or": [{f"updateDescription.updatedFields.{field}": {"$exists": True}} for field in fields],
+            }
+            for collection, fields in WATCHED_FIELDS.items()
+        ]
+        pipeline = [
+            {"$match": {"$or": [
+                {"ns.coll": {"$in": list(WATCHED_FIELDS)}, "operationType": {"$in": ["insert", "replace"]}},
+                *updates,
+            ]}},
+        ]
+        async with self.db.watch(pipeline, full_document="updateLookup") as stream:
+            async for change in stream:
+                event = self._event_from_change(change)
+                if event is not None:
+                    self.publish(event.pop("user_id"), event)
+
+    def _event_from_change(self, change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        collection = change["ns"]["coll"]
+        document = change.get("fullDocument") or {}
+        user_id = document.get("user_id")
+        if user_id not in self._subscribers:
+            return None
+        fields = WATCHED_FIELDS[collection]
+        if change["operationType"] == "update":
+            updated = change.get("updateDescription", {}).get("updatedFields", {})
+            changes = {field: updated[field] for field in fields if field in updated}
+            if not changes:
+                return None
+        else:
+            changes = {field: document.get(field) for field in fields}
+        return {
+            "user_id": user_id,
+            "type": EVENT_TYPES[collection],
+            "op": change["operationType"],
+            "id": document.get("id"),
+            "changes": changes,
+        }
+
+    # Polling fallback
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            user_ids = list(self._subscribers)
+            if not user_ids:
+                continue
+            docs = await self.db.user_versions.find(
+                {"user_id": {"$in": user_ids}}, {"_id": 0}
+            ).to_list(len(user_ids))
+            versions = {doc.pop("user_id"): doc for doc in docs}
+            for user_id in user_ids:
+                version = versions.get(user_id, {})
+                if user_id in self._snapshots and self._versions.get(user_id) == version:
+                    continue
+                self._versions[user_id] = version
+                await self._diff_user(user_id)
+
+    async def _snapshot(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        job_fields = WATCHED_FIELDS["broadcast_jobs"]
+        account_fields = WATCHED_FIELDS["messaging_accounts"]
+        jobs = await self.db.broadcast_jobs.find(
+            {"user_id": user_id}, {"_id": 0, "id": 1, **{f: 1 for f in job_fields}}
+        ).sort("created_at", -1).limit(self.recent_jobs).to_list(self.recent_jobs)
+        accounts = await self.db.messaging_accounts.find(
+            {"user_id": user_id}, {"_id": 0, "id": 1, **{f: 1 for f in account_fields}}
+        ).to_list(None)
+        snapshot = {f"job:{job.pop('id')}": job for job in jobs}
+        snapshot.update({f"account:{account.pop('id')}": account for account in accounts})
+        return snapshot
+
+    async def _diff_user(self, user_id: str) -> None:
+        current = await self._snapshot(user_id)
+        previous = self._snapshots.get(user_id)
+        self._snapshots[user_id] = current
+        if previous is None:
+            return  # first poll for this user only establishes the baseline
+        for key, document in current.items():
+            event_type, item_id = key.split(":", 1)
+            before = previous.get(key)
+            changes = {f: v for f, v in document.items() if before is None or before.get(f) != v}
+            if changes:
+                self.publish(user_id, {
+                    "type": event_type,
+                    "op": "insert" if before is None else "update",
+                    "id": item_id,
+                    "changes": changes,
+                })
+
+
+async def sse_stream(feed: ChangeFeed, user_id: str, is_disconnected,
+                     keepalive: float = 15.0) -> AsyncIterator[bytes]:
+    """Server-sent events for one subscriber.
+
+    The queue is subscribed when iteration starts and unsubscribed when it
+    ends, so a client that leaves before the body is sent leaves nothing behind.
+    """
+    queue = feed.subscribe(user_id)
+    try:
+        yield b"retry: 5000\n\n"
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+    finally:
+        feed.unsubscribe(user_id, queue)
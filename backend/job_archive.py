@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from change_counters import ChangeCounters
+
+logger = logging.getLogger(__name__)
+
+# Statuses that never change again; paused jobs are stopped for good
+FINISHED_JOB_STATUSES = ["completed", "failed", "paused"]
+DUPLICATE_KEY = 11000
+
+
+class JobArchiver:
+    """Moves finished broadcast jobs older than ``retention_days`` to ``broadcast_jobs_archive``.
+
+    ``broadcast_jobs`` then holds only the live working set that the
+    dashboard and job list query. Each batch is copied before it is deleted
+    from the live collection, and the archive's unique ``id`` index turns a
+    re-run after a crash, or the same pass running in several workers, into
+    a no-op. Affected users' change counters are bumped so cached dashboards
+    drop archived jobs.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, retention_days: int = 90, interval: float = 3600,
+                 batch_size: int = 1000, change_counters: Optional[ChangeCounters] = None):
+        self.live = db.broadcast_jobs
+        self.archive = db.broadcast_jobs_archive
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.change_counters = change_counters
+        self._task: Optional[asyncio.Task] = None
+
+    async def archive_once(self, now: Optional[datetime] = None) -> int:
+        """Archive every eligible job in batches; return how many were moved."""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+        query = {"status": {"$in": FINISHED_JOB_STATUSES}, "completed_at": {"$lt": cutoff}}
+        moved = 0
+        while True:
+            jobs = await self.live.find(query, {"_id": 0, "logs": 0}).limit(self.batch_size).to_list(self.batch_size)
+            if not jobs:
+                return moved
+            archived_at = datetime.utcnow()
+            for job in jobs:
+                job["archived_at"] = archived_at
+            try:
+                await self.archive.insert_many(jobs, ordered=False)
+            except BulkWriteError as e:
+                if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                    raise
+            result = await self.live.delete_many({"id": {"$in": [job["id"] for job in jobs]}})
+            moved += result.deleted_count
+            if self.change_counters is not None:
+                for user_id in {job["user_id"] for job in jobs}:
+                    await self.change_counters.bump(user_id, "jobs")
+
+    async def find_job(self, query: Dict[str, Any], projection: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look a job up in the live collection, then in the archive."""
+        job = await self.live.find_one(query, projection)
+        if job is None:
+            job = await self.archive.find_one(query, projection)
+        return job
+
+    def start(self) -> None:
+        if self._task is None and self.retention_days > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                moved = await self.archive_once()
+                if moved:
+                    logger.info(f"Archived {moved} finished broadcast jobs older than {self.retention_days} days")
+            except PyMongoError as e:
+                logger.warning(f"Job archival failed: {str(e)}; retrying next interval")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,72 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+INDEX_OPTIONS_CONFLICT = 85
+
+
+class JobLogStore:
+    """Broadcast job log lines stored one document per line, keyed by (job_id, seq).
+
+    The sequence number comes from the job's ``log_count`` counter, so the job
+    document itself stays fixed-size while its log grows. Entries expire after
+    ``retention_days`` through a TTL index on ``created_at``.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, retention_days: int = 30):
+        self.db = db
+        self.collection = db.job_logs
+        self.retention_days = retention_days
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index(
+            [("job_id", ASCENDING), ("seq", ASCENDING)], name="job_seq_unique", unique=True
+        )
+        ttl_seconds = self.retention_days * 24 * 3600
+        try:
+            await self.collection.create_indexes([
+                IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=ttl_seconds)
+            ])
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            # Retention changed since the index was created
+            await self.db.command({
+                "collMod": self.collection.name,
+                "index": {"name": "created_at_ttl", "expireAfterSeconds": ttl_seconds},
+            })
+
+    async def append(self, job_id: str, message: str) -> Optional[int]:
+        """Store a log line and return its sequence number (None if the job is gone)."""
+        job = await self.db.broadcast_jobs.find_one_and_update(
+            {"id": job_id},
+            {"$inc": {"log_count": 1}},
+            projection={"_id": 0, "log_count": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is None:
+            logger.warning(f"Dropping log line for missing job {job_id}: {message}")
+            return None
+        seq = job["log_count"]
+        await self.collection.insert_one({
+            "job_id": job_id,
+            "seq": seq,
+            "message": message,
+            "created_at": datetime.utcnow(),
+        })
+        return seq
+
+    async def page(self, job_id: str, after: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Return up to ``limit`` entries with seq > ``after`` and the cursor for the next page."""
+        entries: List[Dict[str, Any]] = await self.collection.find(
+            {"job_id": job_id, "seq": {"$gt": after}},
+            {"_id": 0, "seq": 1, "message": 1, "created_at": 1},
+        ).sort("seq", ASCENDING).limit(limit).to_list(limit)
+        next_cursor = entries[-1]["seq"] if len(entries) == limit else None
+        return {"items": entries, "next": next_cursor}
@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import bson
+from pymongo import monitoring
+
+from metrics import REGISTRY
+from profiling import current_profile
+
+logger = logging.getLogger(__name__)
+
+mongo_command_duration = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command",
+    ["collection", "command"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+mongo_command_documents = REGISTRY.counter(
+    "mongo_command_documents_total", "Documents returned or written by MongoDB commands",
+    ["collection", "command"],
+)
+mongo_command_failures = REGISTRY.counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ["collection", "command"],
+)
+mongo_slow_commands = REGISTRY.counter(
+    "mongo_slow_commands_total", "MongoDB commands slower than the slow-op threshold",
+    ["collection", "command"],
+)
+
+mongo_pool_checkout_wait = REGISTRY.histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool",
+    ["address"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+mongo_pool_checkout_failures = REGISTRY.counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts by reason", ["address", "reason"],
+)
+mongo_pool_connections = REGISTRY.gauge(
+    "mongo_pool_connections", "Open pooled connections", ["address"],
+)
+mongo_pool_connections_in_use = REGISTRY.gauge(
+    "mongo_pool_connections_in_use", "Pooled connections currently checked out", ["address"],
+)
+mongo_pool_checkouts_waiting = REGISTRY.gauge(
+    "mongo_pool_checkouts_waiting", "Operations waiting for a pooled connection", ["address"],
+)
+
+# Commands that can be re-run through the explain command
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+IGNORED_COMMANDS = {"explain", "hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue",
+                    "endSessions", "buildInfo", "getLastError"}
+# Keys the driver adds to every command; explain rejects them
+DRIVER_KEYS = {"$db", "lsid", "$clusterTime", "txnNumber", "$readPreference", "autocommit", "startTransaction"}
+
+
+def _collection_of(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    value = command.get(command_name)
+    return value if isinstance(value, str) else ""
+
+
+def _filter_of(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if command_name == "find":
+        return command.get("filter", {})
+    if command_name in ("count", "distinct", "findAndModify"):
+        return command.get("query", {})
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return pipeline[0].get("$match", {})
+    if command_name == "update" and command.get("updates"):
+        return command["updates"][0].get("q", {})
+    if command_name == "delete" and command.get("deletes"):
+        return command["deletes"][0].get("q", {})
+    return None
+
+
+def _opens_await_cursor(command_name: str, command: Dict[str, Any]) -> bool:
+    """True for commands whose cursor is read with blocking awaitData getMores."""
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return "$changeStream" in pipeline[0]
+    return command_name == "find" and bool(command.get("tailable")) and bool(command.get("awaitData"))
+
+
+def _reply_cursor_id(reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    return int(cursor.get("id", 0)) if isinstance(cursor, dict) else 0
+
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values with placeholders, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(item) for item in value[:1]] if value else []
+    return "?"
+
+
+def _document_count(command_name: str, reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if command_name in ("insert", "update", "delete", "count"):
+        return int(reply.get("n", 0))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    return 0
+
+
+class SlowOpRecorder:
+    """Keeps the most recent slow MongoDB operations in memory."""
+
+    def __init__(self, maxlen: int = 200):
+        self._ops: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, op: Dict[str, Any]) -> None:
+        with self._lock:
+            self._ops.append(op)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._ops)[-limit:][::-1]
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Per-collection, per-command latency and document counts, plus a slow-op log.
+
+    pymongo calls the listener from Motor's worker threads, so explain() for a
+    slow operation is scheduled back onto the event loop captured by attach().
+    Each query shape is explained at most once per process.
+
+    getMores on change-stream and tailable cursors block server-side until
+    data arrives or the await time passes, so their duration is idle wait:
+    they are left out of the latency histogram and the slow-op log.
+    """
+
+    def __init__(self, slow_ms: float = 100, explain: bool = False, recorder: Optional[SlowOpRecorder] = None):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.recorder = recorder or SlowOpRecorder()
+        self._pending: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._explained: set = set()
+        self._await_cursors: set = set()
+
+    def attach(self, client, loop: asyncio.AbstractEventLoop) -> None:
+        """Enable explain() of slow operations through ``client`` on ``loop``."""
+        self._client = client
+        self._loop = loop
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        # The active request profile, if any, is carried into Motor's worker thread
+        profile = current_profile()
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (event.database_name, event.command, profile)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        database, command, profile = pending
+        collection = _collection_of(event.command_name, command)
+        if self._is_await_getmore(event.command_name, command, event.reply):
+            mongo_command_documents.inc(collection, event.command_name,
+                                        amount=_document_count(event.command_name, event.reply))
+            return
+        duration_ms = event.duration_micros / 1000
+        if profile is not None:
+            duration = event.duration_micros / 1e6
+            profile.add_io("mongo", f"{event.command_name} {collection}", time.perf_counter() - duration, duration)
+        documents = _document_count(event.command_name, event.reply)
+        mongo_command_duration.observe(duration_ms / 1000, collection, event.command_name)
+        mongo_command_documents.inc(collection, event.command_name, amount=documents)
+        if duration_ms >= self.slow_ms:
+            reply_bytes = len(bson.encode(event.reply))
+            self._record_slow(database, collection, event.command_name, command, duration_ms, documents, reply_bytes)
+
+    def _is_await_getmore(self, command_name: str, command: Dict[str, Any], reply: Dict[str, Any]) -> bool:
+        """Track cursors opened for awaitData reads; True for a getMore on one of them."""
+        with self._lock:
+            if _opens_await_cursor(command_name, command):
+                cursor_id = _reply_cursor_id(reply)
+                if cursor_id:
+                    self._await_cursors.add(cursor_id)
+                return False
+            if command_name == "killCursors":
+                self._await_cursors.difference_update(command.get("cursors", []))
+                return False
+            if command_name != "getMore" or command.get("getMore") not in self._await_cursors:
+                return False
+            if not _reply_cursor_id(reply):
+                self._await_cursors.discard(command["getMore"])
+            return True
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is not None and event.command_name == "getMore":
+                self._await_cursors.discard(pending[1].get("getMore"))
+        if pending is None:
+            return
+        mongo_command_failures.inc(_collection_of(event.command_name, pending[1]), event.command_name)
+
+    def _record_slow(self, database: str, collection: str, command_name: str,
+                     command: Dict[str, Any], duration_ms: float, documents: int, reply_bytes: int) -> None:
+        mongo_slow_commands.inc(collection, command_name)
+        filter_doc = _filter_of(command_name, command)
+        shape = query_shape(filter_doc) if filter_doc is not None else None
+        op = {
+            "timestamp": datetime.utcnow(),
+            "database": database,
+            "collection": collection,
+            "command": command_name,
+            "duration_ms": round(duration_ms, 3),
+            "documents": documents,
+            "reply_bytes": reply_bytes,
+            "filter_shape": shape,
+            "explain": None,
+        }
+        self.recorder.record(op)
+        logger.warning(f"Slow Mongo {command_name} on {collection}: {duration_ms:.1f} ms, "
+                       f"{documents} docs, {reply_bytes} bytes, filter {shape}")
+
+        if not self.explain or command_name not in EXPLAINABLE_COMMANDS or self._client is None:
+            return
+        key = (database, collection, command_name, repr(shape))
+        if key in self._explained or self._loop is None or self._loop.is_closed():
+            return
+        self._explained.add(key)
+        explain_command = {k: v for k, v in command.items() if k not in DRIVER_KEYS}
+        asyncio.run_coroutine_threadsafe(self._explain(op, database, explain_command), self._loop)
+
+    async def _explain(self, op: Dict[str, Any], database: str, command: Dict[str, Any]) -> None:
+        try:
+            result = await self._client[database].command("explain", command, verbosity="queryPlanner")
+            op["explain"] = result.get("queryPlanner", result)
+        except Exception as e:
+            op["explain"] = {"error": str(e)}
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Connection pool saturation: checkout wait times and in-use/open/waiting counts.
+
+    A checkout starts and finishes on the same Motor worker thread, so the
+    wait is measured per (address, thread). stats() gives the current counts
+    for the readiness probe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_started: Dict[tuple, float] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _change(self, address: str, **deltas: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(address, {"open": 0, "in_use": 0, "waiting": 0})
+            for key, delta in deltas.items():
+                stats[key] += delta
+            snapshot = dict(stats)
+        mongo_pool_connections.set(address, value=snapshot["open"])
+        mongo_pool_connections_in_use.set(address, value=snapshot["in_use"])
+        mongo_pool_checkouts_waiting.set(address, value=snapshot["waiting"])
+
+    def _checkout_wait(self, address: str) -> Optional[float]:
+        with self._lock:
+            start = self._checkout_started.pop((address, threading.get_ident()), None)
+        return None if start is None else time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._stats.items()}
+
+    def connection_check_out_started(self, event) -> None:
+        address = _address(event.address)
+        with self._lock:
+            self._checkout_started[(address, threading.get_ident())] = time.perf_counter()
+        self._change(address, waiting=1)
+
+    def connection_checked_out(self, event) -> None:
+        address = _address(event.address)
+        wait = self._checkout_wait(address)
+        if wait is not None:
+            mongo_pool_checkout_wait.observe(wait, address)
+        self._change(address, waiting=-1, in_use=1)
+
+    def connection_check_out_failed(self, event) -> None:
+        address = _address(event.address)
+        wait = self._checkout_wait(address)
+        if wait is not None:
+            mongo_pool_checkout_wait.observe(wait, address)
+        mongo_pool_checkout_failures.inc(address, str(event.reason))
+        self._change(address, waiting=-1)
+
+    def connection_checked_in(self, event) -> None:
+        self._change(_address(event.address), in_use=-1)
+
+    def connection_created(self, event) -> None:
+        self._change(_address(event.address), open=1)
+
+    def connection_closed(self, event) -> None:
+        self._change(_address(event.address), open=-1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
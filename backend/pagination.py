@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Opaque keyset cursor pointing just after the (created_at, id) pair."""
+    raw = json.dumps({"c": created_at.isoformat(), "i": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {"created_at": datetime.fromisoformat(data["c"]), "id": str(data["i"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
+
+
+def keyset_filter(base: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Extend ``base`` to match documents after ``cursor`` in (created_at, id) order."""
+    if not cursor:
+        return base
+    position = decode_cursor(cursor)
+    return {
+        **base,
+        "$or": [
+            {"created_at": {"$gt": position["created_at"]}},
+            {"created_at": position["created_at"], "id": {"$gt": position["id"]}},
+        ],
+    }
@@ -0,0 +1,40 @@
+import math
+import time
+
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+CALIBRATION_SECRET = "calibration-password"
+
+
+def bcrypt_hash_seconds(rounds: int, samples: int = 3) -> float:
+    """Fastest of ``samples`` bcrypt hashes at ``rounds``, the one least disturbed by other load."""
+    hasher = bcrypt.using(rounds=rounds)
+    best = math.inf
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(CALIBRATION_SECRET)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate_bcrypt_rounds(target_seconds: float, min_rounds: int, max_rounds: int,
+                            probe_rounds: int = 9) -> int:
+    """The bcrypt cost whose hash time on this machine is closest to ``target_seconds``.
+
+    Each extra round doubles the work, so timing one cheap probe cost is
+    enough to extrapolate to the rest. The result is clamped to
+    ``[min_rounds, max_rounds]``.
+    """
+    probe = bcrypt_hash_seconds(probe_rounds)
+    rounds = probe_rounds + round(math.log2(target_seconds / probe))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+def apply_bcrypt_rounds(context: CryptContext, rounds: int) -> None:
+    """Hash new passwords at ``rounds`` and make needs_update() flag stored hashes below it.
+
+    Stronger stored hashes are left alone, so a worker that calibrates lower
+    never weakens a password another worker upgraded.
+    """
+    context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
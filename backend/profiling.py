@@ -0,0 +1,209 @@
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    return _active_profile.get()
+
+
+def record_io(kind: str, name: str, start: float, duration: float) -> None:
+    """Add an awaited I/O span (perf_counter seconds) to the active profile, if any."""
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.add_io(kind, name, start, duration)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval from a helper thread.
+
+    stop() does not join the helper thread, so stopping never blocks the
+    sampled (event-loop) thread; samples taken after stop() are discarded.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.002, max_depth: int = 64):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Signal the helper thread to exit and return the samples collected so far."""
+        with self._lock:
+            self._stop.set()
+            return Counter(self.samples)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self.thread_id == me:
+                continue
+            stack: List[str] = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            with self._lock:
+                if self._stop.is_set():
+                    break
+                self.samples[tuple(reversed(stack))] += 1
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.created_at = datetime.utcnow()
+        self.status_code: Optional[int] = None
+        self.duration_ms = 0.0
+        self.interval_ms = 0.0
+        self.cpu_samples: Counter = Counter()
+        self.io: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_io(self, kind: str, name: str, start: float, duration: float) -> None:
+        with self._lock:
+            self.io.append({
+                "kind": kind,
+                "name": name,
+                "offset_ms": round((start - self._start) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+            })
+
+    def folded(self) -> str:
+        """CPU samples in the folded-stack format used by flamegraph tools."""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.cpu_samples.most_common()) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "created_at": self.created_at,
+            "status_code": self.status_code,
+            "duration_ms": self.duration_ms,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            io = sorted(self.io, key=lambda span: span["offset_ms"])
+        return {
+            **self.summary(),
+            "sample_interval_ms": self.interval_ms,
+            "cpu_samples": sum(self.cpu_samples.values()),
+            "cpu_top": [
+                {"stack": list(stack), "samples": count} for stack, count in self.cpu_samples.most_common(20)
+            ],
+            "io_timeline": io,
+        }
+
+
+class ProfileStore:
+    """The most recent request profiles, kept in memory for download."""
+
+    def __init__(self, maxlen: int = 50):
+        self._profiles: deque = deque(maxlen=maxlen)
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [p.summary() for p in reversed(self._profiles)]
+
+
+class ProfilingMiddleware:
+    """Opt-in per-request profiler.
+
+    A request is profiled when it carries ``X-Profile: 1`` and ``authorize``
+    accepts its bearer token (admins only), or when it is picked by
+    ``sample_rate``. Profiled requests get a stack sampler on the event-loop
+    thread and an I/O timeline fed by record_io(). Samples cover everything
+    the loop runs while the request is in flight, including other requests.
+    Unprofiled requests cost a header lookup and, with a non-zero sample
+    rate, one random() call.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore,
+                 authorize: Callable[[str], Awaitable[bool]],
+                 sample_rate: float = 0.0, interval: float = 0.002, path_prefix: str = "/api"):
+        self.app = app
+        self.store = store
+        self.authorize = authorize
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.path_prefix = path_prefix
+
+    async def _trigger(self, scope: Scope) -> Optional[str]:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) in ("1", "true"):
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            if scheme.lower() == "bearer" and token and await self.authorize(token):
+                return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+        profile.interval_ms = self.interval * 1000
+        sampler = StackSampler(threading.get_ident(), self.interval)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode(), profile.id.encode())
+                ]
+            await send(message)
+
+        token = _active_profile.set(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            samples = sampler.stop()
+            _active_profile.reset(token)
+            profile.duration_ms = round((time.perf_counter() - profile._start) * 1000, 3)
+            profile.cpu_samples = samples
+            self.store.add(profile)
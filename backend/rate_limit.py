@@ -0,0 +1,84 @@
+import abc
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class RateLimitBackend(abc.ABC):
+    """Storage for token buckets.
+
+    ``take`` must refill and consume atomically for its store; a shared backend
+    (Redis, Memcached, Mongo) implements the same contract so every worker
+    sees one bucket per key.
+    """
+
+    @abc.abstractmethod
+    async def take(self, key: str, capacity: float, refill_per_second: float,
+                   cost: float = 1.0) -> RateLimitDecision:
+        ...
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process token buckets, LRU-bounded so key churn cannot grow memory."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float,
+                   cost: float = 1.0) -> RateLimitDecision:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        if tokens >= cost:
+            decision = RateLimitDecision(True)
+            tokens -= cost
+        else:
+            decision = RateLimitDecision(False, (cost - tokens) / refill_per_second)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return decision
+
+
+@dataclass
+class BucketRule:
+    capacity: float
+    refill_per_second: float
+
+    def __post_init__(self):
+        if self.capacity < 1:
+            raise ValueError(f"Bucket capacity must be at least 1, got {self.capacity}")
+        if self.refill_per_second <= 0:
+            raise ValueError(f"Bucket refill rate must be positive, got {self.refill_per_second}")
+
+
+class TokenBucketLimiter:
+    """Checks a request against several named buckets (e.g. per IP, per email)."""
+
+    def __init__(self, backend: RateLimitBackend, rules: Dict[str, BucketRule], prefix: str = "rl"):
+        self.backend = backend
+        self.rules = rules
+        self.prefix = prefix
+
+    async def check(self, keys: Iterable[Tuple[str, Optional[str]]]) -> RateLimitDecision:
+        """Consume one token from each ``(rule, value)`` bucket; deny if any is empty."""
+        retry_after = 0.0
+        for rule_name, value in keys:
+            if not value:
+                continue
+            rule = self.rules[rule_name]
+            decision = await self.backend.take(
+                f"{self.prefix}:{rule_name}:{value}", rule.capacity, rule.refill_per_second
+            )
+            if not decision.allowed:
+                retry_after = max(retry_after, decision.retry_after)
+        return RateLimitDecision(retry_after == 0.0, retry_after)
@@ -1,11 +1,19 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import math
 import os
+import time
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
@@ -14,14 +22,50 @@ import uuid
 import jwt
 from enum import Enum
 
+from database import MongoSettings, create_client
+from db_indexes import ensure_indexes, check_query_plans
+from cache import ResponseCache, TTLCache, cached_response
+from job_logs import JobLogStore
+from job_archive import JobArchiver
+from daily_stats import DailyStatsStore
+from password_hashing import apply_bcrypt_rounds, calibrate_bcrypt_rounds
+from pagination import InvalidCursor, encode_cursor, keyset_filter
+from responses import FastJSONResponse, REVALIDATE_CACHE_CONTROL, etag_matches, not_modified, weak_etag
+from change_counters import ChangeCounters
+from compression import CompressionMiddleware
+from events import ChangeFeed, sse_stream
+from metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware
+from mongo_monitoring import MongoCommandListener, MongoPoolListener
+from profiling import ProfileStore, ProfilingMiddleware, record_io
+from rate_limit import BucketRule, InMemoryBackend, TokenBucketLimiter
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB, instrumented per collection/command (see mongo_monitoring.py). The
+# client and the stores bound to it are created per worker process in
+# lifespan(), never at import time, so no connection pool crosses a fork.
+MONGO_SLOW_OP_MS = float(os.environ.get('MONGO_SLOW_OP_MS', 100))
+MONGO_SLOW_OP_EXPLAIN = os.environ.get('MONGO_SLOW_OP_EXPLAIN', 'false').lower() in ('1', 'true', 'yes')
+mongo_listener = MongoCommandListener(slow_ms=MONGO_SLOW_OP_MS, explain=MONGO_SLOW_OP_EXPLAIN)
+pool_listener = MongoPoolListener()
+client: Optional[AsyncIOMotorClient] = None
+db: Optional[AsyncIOMotorDatabase] = None
+
+# Broadcast job logs live in their own collection, see job_logs.py
+JOB_LOG_RETENTION_DAYS = int(os.environ.get('JOB_LOG_RETENTION_DAYS', 30))
+job_logs: Optional[JobLogStore] = None
+daily_stats: Optional[DailyStatsStore] = None
+# Per-user version counters behind the ETags of polled endpoints
+change_counters: Optional[ChangeCounters] = None
+# Job/account change events for /api/events (change stream, or polling on a standalone mongod)
+CHANGE_FEED_POLL_SECONDS = float(os.environ.get('CHANGE_FEED_POLL_SECONDS', 2))
+change_feed: Optional[ChangeFeed] = None
+# Finished jobs older than this move to broadcast_jobs_archive (0 disables), see job_archive.py
+JOB_ARCHIVE_AFTER_DAYS = int(os.environ.get('JOB_ARCHIVE_AFTER_DAYS', 90))
+JOB_ARCHIVE_INTERVAL_SECONDS = float(os.environ.get('JOB_ARCHIVE_INTERVAL_SECONDS', 3600))
+job_archiver: Optional[JobArchiver] = None
 
 # Security
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
@@ -29,10 +73,105 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt cost: PASSWORD_HASH_ROUNDS pins it, otherwise each worker calibrates at
+# startup to about PASSWORD_HASH_TARGET_MS per hash within the min/max rounds.
+# Stored hashes below the cost are upgraded on the next successful login.
+PASSWORD_HASH_ROUNDS = os.environ.get('PASSWORD_HASH_ROUNDS')
+PASSWORD_HASH_TARGET_MS = float(os.environ.get('PASSWORD_HASH_TARGET_MS', 250))
+PASSWORD_HASH_MIN_ROUNDS = int(os.environ.get('PASSWORD_HASH_MIN_ROUNDS', 10))
+PASSWORD_HASH_MAX_ROUNDS = int(os.environ.get('PASSWORD_HASH_MAX_ROUNDS', 14))
+password_hash_rounds: Optional[int] = None
+
+# bcrypt releases the GIL, so a thread pool keeps hashing off the event loop;
+# max_workers caps how many hashes run at once per worker process, the rest
+# queue up. Created in lifespan() like the Mongo client.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+password_hash_executor: Optional[ThreadPoolExecutor] = None
+
 security = HTTPBearer()
 
+# Token buckets in front of the bcrypt-heavy auth endpoints, per client IP and per email
+AUTH_RATE_LIMIT_ENABLED = os.environ.get('AUTH_RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+auth_rate_limiter = TokenBucketLimiter(
+    InMemoryBackend(),
+    {
+        "ip": BucketRule(
+            capacity=float(os.environ.get('AUTH_RATE_LIMIT_IP_BURST', 20)),
+            refill_per_second=float(os.environ.get('AUTH_RATE_LIMIT_IP_PER_MINUTE', 30)) / 60,
+        ),
+        "email": BucketRule(
+            capacity=float(os.environ.get('AUTH_RATE_LIMIT_EMAIL_BURST', 5)),
+            refill_per_second=float(os.environ.get('AUTH_RATE_LIMIT_EMAIL_PER_MINUTE', 10)) / 60,
+        ),
+    },
+    prefix="auth",
+)
+
+# Authenticated user records, keyed by user id. No endpoint changes a user's
+# plan, admin flag or profile yet; one that does must call
+# user_cache.invalidate(user_id), or other requests see the old record for up
+# to the TTL (and other workers always do until it expires).
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', 60))
+USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', 10000))
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Verified JWT claims keyed by a SHA-256 of the token; entries expire at the token's exp
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 10000))
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Rendered read responses per user. Local bumps invalidate at once; writes made
+# by other workers show up within the TTL.
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 2))
+RESPONSE_CACHE_MAX_SIZE = int(os.environ.get('RESPONSE_CACHE_MAX_SIZE', 10000))
+response_cache = ResponseCache(maxsize=RESPONSE_CACHE_MAX_SIZE, ttl=RESPONSE_CACHE_TTL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open this worker's Mongo client, stores and background tasks; close them on shutdown."""
+    global client, db, job_logs, daily_stats, change_counters, change_feed, job_archiver
+    global password_hash_executor, password_hash_rounds
+    settings = MongoSettings.from_env()
+    client = create_client(settings, event_listeners=[mongo_listener, pool_listener])
+    db = client[settings.db_name]
+    job_logs = JobLogStore(db, retention_days=JOB_LOG_RETENTION_DAYS)
+    daily_stats = DailyStatsStore(db)
+    change_counters = ChangeCounters(db)
+    change_counters.on_bump(response_cache.invalidate_user)
+    change_feed = ChangeFeed(db, poll_interval=CHANGE_FEED_POLL_SECONDS)
+    job_archiver = JobArchiver(
+        db, retention_days=JOB_ARCHIVE_AFTER_DAYS, interval=JOB_ARCHIVE_INTERVAL_SECONDS,
+        change_counters=change_counters,
+    )
+    password_hash_executor = ThreadPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+    )
+    if PASSWORD_HASH_ROUNDS:
+        password_hash_rounds = int(PASSWORD_HASH_ROUNDS)
+    else:
+        password_hash_rounds = await asyncio.get_running_loop().run_in_executor(
+            password_hash_executor, calibrate_bcrypt_rounds,
+            PASSWORD_HASH_TARGET_MS / 1000, PASSWORD_HASH_MIN_ROUNDS, PASSWORD_HASH_MAX_ROUNDS,
+        )
+    apply_bcrypt_rounds(pwd_context, password_hash_rounds)
+    logger.info(f"Hashing passwords with bcrypt cost {password_hash_rounds}")
+
+    mongo_listener.attach(client, asyncio.get_running_loop())
+    await ensure_indexes(db)
+    await job_logs.ensure_indexes()
+    await check_query_plans(db)
+    change_feed.start()
+    job_archiver.start()
+    try:
+        yield
+    finally:
+        await job_archiver.stop()
+        await change_feed.stop()
+        client.close()
+        password_hash_executor.shutdown(wait=False)
+
 # Create the main app without a prefix
-app = FastAPI(title="Sender API", version="1.0.0")
+app = FastAPI(title="Sender API", version="1.0.0", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -65,16 +204,21 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
-class User(BaseModel):
+class UserProfile(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     email: EmailStr
     name: str
-    hashed_password: str
     subscription_plan: SubscriptionPlan = SubscriptionPlan.FREE_TRIAL
     is_admin: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class User(UserProfile):
+    hashed_password: str
+
+# Everything get_current_user needs, without the password hash
+USER_PROFILE_PROJECTION = {"_id": 0, "hashed_password": 0}
+
 class MessagingAccount(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
@@ -115,9 +259,26 @@ class BroadcastJob(BaseModel):
     total_recipients: int = 0
     successful_sends: int = 0
     failed_sends: int = 0
-    logs: List[str] = []
+    log_count: int = 0  # entries are read through /jobs/{job_id}/logs
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class JobSummary(BaseModel):
+    """Fixed-size view of a job for lists; no logs or recipient/template ids."""
+    id: str
+    name: str
+    account_id: str
+    platform: PlatformType
+    status: JobStatus
+    scheduled_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    total_recipients: int = 0
+    successful_sends: int = 0
+    failed_sends: int = 0
+    created_at: datetime
+
+JOB_SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in JobSummary.model_fields}}
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -136,6 +297,26 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def run_password_hashing(func, *args):
+    """Run a blocking hashing function in the bounded password hash pool."""
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(password_hash_executor, func, *args)
+    finally:
+        record_io("password_hash", func.__name__, start, time.perf_counter() - start)
+
+async def rehash_password(user_id: str, old_hash: str, password: str):
+    """Store ``password`` re-hashed at the current cost, unless the hash changed meanwhile."""
+    try:
+        new_hash = await run_password_hashing(get_password_hash, password)
+        await db.users.update_one(
+            {"id": user_id, "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}}
+        )
+    except Exception as e:
+        logger.warning(f"Password rehash for user {user_id} failed: {str(e)}")
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -146,28 +327,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verified claims of ``token``, or None if it is invalid or expired."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except jwt.PyJWTError:
+    payload = decode_access_token(credentials.credentials)
+    user_id: str = payload.get("sub") if payload else None
+    if user_id is None:
         raise credentials_exception
     
-    user = await db.users.find_one({"id": user_id})
+    user = user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
-    return User(**user)
+        user_doc = await db.users.find_one({"id": user_id}, USER_PROFILE_PROJECTION)
+        if user_doc is None:
+            raise credentials_exception
+        user = UserProfile(**user_doc)
+        user_cache.set(user_id, user)
+    return user
+
+async def get_current_admin(current_user: UserProfile = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+async def enforce_auth_rate_limit(request: Request, email: str):
+    """Reject with 429 before any Mongo or bcrypt work when a bucket is empty.
+
+    request.client is the peer address. Behind a load balancer, run uvicorn
+    with --proxy-headers --forwarded-allow-ips=<balancer IPs> so it is the
+    real client from X-Forwarded-For; otherwise every user shares one IP bucket.
+    """
+    if not AUTH_RATE_LIMIT_ENABLED:
+        return
+    decision = await auth_rate_limiter.check([
+        ("ip", request.client.host if request.client else None),
+        ("email", email.lower()),
+    ])
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(math.ceil(decision.retry_after))},
+        )
 
 # Auth endpoints
 @api_router.post("/auth/register", response_model=Token)
-async def register(user_data: UserCreate):
+async def register(user_data: UserCreate, request: Request):
+    await enforce_auth_rate_limit(request, user_data.email)
+    
     # Check if user exists
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
@@ -177,14 +401,21 @@ async def register(user_data: UserCreate):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await run_password_hashing(get_password_hash, user_data.password)
     new_user = User(
         email=user_data.email,
         name=user_data.name,
         hashed_password=hashed_password
     )
     
-    await db.users.insert_one(new_user.dict())
+    try:
+        await db.users.insert_one(new_user.dict())
+    except DuplicateKeyError:
+        # A concurrent registration for the same email won the email_unique index
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -195,15 +426,23 @@ async def register(user_data: UserCreate):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @api_router.post("/auth/login", response_model=Token)
-async def login(user_credentials: UserLogin):
+async def login(user_credentials: UserLogin, request: Request, background_tasks: BackgroundTasks):
+    await enforce_auth_rate_limit(request, user_credentials.email)
+    
     user = await db.users.find_one({"email": user_credentials.email})
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    if not user or not await run_password_hashing(
+        verify_password, user_credentials.password, user["hashed_password"]
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade hashes made at a lower cost once the response has been sent
+    if pwd_context.needs_update(user["hashed_password"]):
+        background_tasks.add_task(rehash_password, user["id"], user["hashed_password"], user_credentials.password)
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user["id"]}, expires_delta=access_token_expires
@@ -212,67 +451,130 @@ async def login(user_credentials: UserLogin):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @api_router.get("/auth/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserProfile = Depends(get_current_user)):
     return UserResponse(**current_user.dict())
 
+# Read endpoints return FastJSONResponse: models are validated once when built
+# from Mongo documents and serialized with orjson, skipping the response_model pass.
+
 # Dashboard endpoint
+ACTIVE_JOB_STATUSES = [JobStatus.PENDING, JobStatus.RUNNING]
+
 @api_router.get("/dashboard")
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
-    # Get active accounts count
-    active_accounts = await db.messaging_accounts.count_documents({
-        "user_id": current_user.id,
-        "is_active": True
-    })
+@cached_response(response_cache, "dashboard")
+async def get_dashboard_stats(request: Request, current_user: UserProfile = Depends(get_current_user)):
+    # Today's date is part of the tag because messages_today rolls over at midnight UTC
+    versions = await change_counters.get(current_user.id)
+    etag = weak_etag("dashboard", current_user.id, versions["accounts"], versions["jobs"], DailyStatsStore.day_key())
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    # Get messages sent today
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    messages_today = await db.broadcast_jobs.aggregate([
-        {
-            "$match": {
-                "user_id": current_user.id,
-                "started_at": {"$gte": today}
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "total_successful": {"$sum": "$successful_sends"},
-                "total_failed": {"$sum": "$failed_sends"}
-            }
-        }
-    ]).to_list(1)
-    
-    messages_stats = messages_today[0] if messages_today else {"total_successful": 0, "total_failed": 0}
-    
-    # Get active jobs
-    active_jobs = await db.broadcast_jobs.count_documents({
-        "user_id": current_user.id,
-        "status": {"$in": [JobStatus.PENDING, JobStatus.RUNNING]}
-    })
-    
-    # Get recent jobs
-    recent_jobs = await db.broadcast_jobs.find({
-        "user_id": current_user.id
-    }).sort("created_at", -1).limit(10).to_list(10)
+    # Every query is bounded by an index (user_active, user_status,
+    # user_created_at, user_day_unique) and they run concurrently, so the
+    # dashboard costs one round-trip of wall time whatever the job history.
+    active_accounts, active_jobs, recent_jobs, messages_today = await asyncio.gather(
+        db.messaging_accounts.count_documents({
+            "user_id": current_user.id,
+            "is_active": True
+        }),
+        db.broadcast_jobs.count_documents({
+            "user_id": current_user.id,
+            "status": {"$in": ACTIVE_JOB_STATUSES}
+        }),
+        db.broadcast_jobs.find(
+            {"user_id": current_user.id}, JOB_SUMMARY_PROJECTION
+        ).sort("created_at", -1).limit(10).to_list(10),
+        daily_stats.get_day(current_user.id)
+    )
     
-    return {
+    return FastJSONResponse({
         "active_accounts": active_accounts,
-        "messages_today": {
-            "successful": messages_stats["total_successful"],
-            "failed": messages_stats["total_failed"]
-        },
+        "messages_today": messages_today,
         "active_jobs": active_jobs,
-        "recent_jobs": [BroadcastJob(**job) for job in recent_jobs]
-    }
+        "recent_jobs": [JobSummary(**job) for job in recent_jobs]
+    }, headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
+
+@api_router.get("/events")
+async def stream_events(request: Request, current_user: UserProfile = Depends(get_current_user)):
+    """Server-sent events with small diffs of the user's job and account changes."""
+    return StreamingResponse(
+        sse_stream(change_feed, current_user.id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/stats/daily")
+async def get_daily_stats(days: int = Query(30, ge=1, le=366), current_user: UserProfile = Depends(get_current_user)):
+    return FastJSONResponse(await daily_stats.series(current_user.id, days))
+
+# Broadcast jobs
+@api_router.get("/jobs", response_model=List[JobSummary])
+async def get_jobs(limit: int = Query(50, ge=1, le=100), current_user: UserProfile = Depends(get_current_user)):
+    jobs = await db.broadcast_jobs.find(
+        {"user_id": current_user.id}, JOB_SUMMARY_PROJECTION
+    ).sort("created_at", -1).limit(limit).to_list(limit)
+    return FastJSONResponse([JobSummary(**job) for job in jobs])
+
+@api_router.get("/jobs/{job_id}", response_model=BroadcastJob)
+async def get_job(job_id: str, current_user: UserProfile = Depends(get_current_user)):
+    job = await job_archiver.find_job({"id": job_id, "user_id": current_user.id}, {"_id": 0, "logs": 0})
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return FastJSONResponse(BroadcastJob(**job))
+
+@api_router.get("/jobs/{job_id}/logs")
+async def get_job_logs(
+    job_id: str,
+    after: int = Query(0, ge=0, description="Return entries with seq greater than this cursor"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    job = await job_archiver.find_job({"id": job_id, "user_id": current_user.id}, {"_id": 1})
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return FastJSONResponse(await job_logs.page(job_id, after=after, limit=limit))
 
 # Basic CRUD endpoints for accounts
+ACCOUNTS_SORT = [("created_at", 1), ("id", 1)]
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def stream_accounts(cursor):
+    async for account in cursor:
+        yield MessagingAccount(**account).model_dump_json() + "\n"
+
 @api_router.get("/accounts", response_model=List[MessagingAccount])
-async def get_accounts(current_user: User = Depends(get_current_user)):
-    accounts = await db.messaging_accounts.find({"user_id": current_user.id}).to_list(100)
-    return [MessagingAccount(**account) for account in accounts]
+@cached_response(response_cache, "accounts", vary=("limit", "cursor", "stream"), vary_headers=("accept",))
+async def get_accounts(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    stream: bool = Query(False, description="Stream every remaining account as NDJSON"),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    try:
+        query = keyset_filter({"user_id": current_user.id}, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        accounts_cursor = db.messaging_accounts.find(query, {"_id": 0}).sort(ACCOUNTS_SORT).batch_size(limit)
+        return StreamingResponse(stream_accounts(accounts_cursor), media_type=NDJSON_MEDIA_TYPE)
+    
+    versions = await change_counters.get(current_user.id)
+    etag = weak_etag("accounts", current_user.id, versions["accounts"], limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # One extra document tells whether there is a next page
+    accounts = await db.messaging_accounts.find(query, {"_id": 0}).sort(ACCOUNTS_SORT).limit(limit + 1).to_list(limit + 1)
+    page = [MessagingAccount(**account) for account in accounts[:limit]]
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if len(accounts) > limit:
+        headers["X-Next-Cursor"] = encode_cursor(page[-1].created_at, page[-1].id)
+    return FastJSONResponse(page, headers=headers)
 
 @api_router.post("/accounts", response_model=MessagingAccount)
-async def create_account(account_data: dict, current_user: User = Depends(get_current_user)):
+async def create_account(account_data: dict, current_user: UserProfile = Depends(get_current_user)):
     new_account = MessagingAccount(
         user_id=current_user.id,
         platform=account_data["platform"],
@@ -281,8 +583,32 @@ async def create_account(account_data: dict, current_user: User = Depends(get_cu
     )
     
     await db.messaging_accounts.insert_one(new_account.dict())
+    await change_counters.bump(current_user.id, "accounts")
     return new_account
 
+# Admin diagnostics
+@api_router.get("/admin/slow-ops")
+async def get_slow_ops(limit: int = Query(50, ge=1, le=200), current_user: UserProfile = Depends(get_current_admin)):
+    return FastJSONResponse(mongo_listener.recorder.recent(limit))
+
+@api_router.get("/admin/profiles")
+async def get_profiles(current_user: UserProfile = Depends(get_current_admin)):
+    return FastJSONResponse(profile_store.list())
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("json", pattern="^(json|folded)$"),
+                      current_user: UserProfile = Depends(get_current_admin)):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(profile.folded(), headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'
+        })
+    return FastJSONResponse(profile.to_dict(), headers={
+        "Content-Disposition": f'attachment; filename="profile-{profile_id}.json"'
+    })
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -292,15 +618,79 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor and validator must be readable by cross-origin clients
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+
+# Compress complete responses of 1 KiB and more (brotli when installed, else gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Opt-in request profiling: admins send "X-Profile: 1", or set PROFILE_SAMPLE_RATE
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 2))
+profile_store = ProfileStore(maxlen=int(os.environ.get('PROFILE_STORE_SIZE', 50)))
+
+async def is_admin_token(token: str) -> bool:
+    try:
+        user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    except HTTPException:
+        return False
+    return user.is_admin
+
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    authorize=is_admin_token,
+    sample_rate=PROFILE_SAMPLE_RATE,
+    interval=PROFILE_INTERVAL_MS / 1000,
 )
 
+# Outermost, so the timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+# Load balancer probes. /readyz fails when Mongo does not answer a ping in
+# time, which includes waiting on an exhausted pool, or when too many
+# operations are queued for a connection (READINESS_MAX_POOL_WAITERS, 0 = off).
+READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', 2))
+READINESS_MAX_POOL_WAITERS = int(os.environ.get('READINESS_MAX_POOL_WAITERS', 0))
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    return FastJSONResponse({"status": "ok"})
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    checks = {"mongo": "ok", "pool": "ok"}
+    start = time.perf_counter()
+    try:
+        if db is None:
+            raise RuntimeError("not started")
+        await asyncio.wait_for(db.command("ping"), timeout=READINESS_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        checks["mongo"] = f"ping timed out after {READINESS_TIMEOUT_SECONDS}s"
+    except Exception as e:
+        checks["mongo"] = str(e)
+    ping_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    pools = pool_listener.stats()
+    waiting = sum(pool["waiting"] for pool in pools.values())
+    if READINESS_MAX_POOL_WAITERS and waiting >= READINESS_MAX_POOL_WAITERS:
+        checks["pool"] = f"{waiting} operations waiting for a connection"
+
+    ready = all(check == "ok" for check in checks.values())
+    return FastJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks, "ping_ms": ping_ms, "pools": pools},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Cache-Control": "no-store"},
+    )
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
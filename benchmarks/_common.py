@@ -0,0 +1,146 @@
+"""Shared helpers for the local benchmark scripts.
+
+The scripts import backend/server.py in-process and drive it through httpx's
+ASGI transport, so they need a local mongod (MONGO_URL, default
+mongodb://localhost:27017). Each run uses a throwaway database
+(BENCH_DB_NAME, default "sender_benchmark") that is dropped on start.
+The auth rate limiter is disabled unless AUTH_RATE_LIMIT_ENABLED is set, since
+every benchmark client shares one IP.
+"""
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def load_server(db_name: Optional[str] = None):
+    """Import backend/server.py against the benchmark database."""
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("AUTH_RATE_LIMIT_ENABLED", "false")
+    os.environ["DB_NAME"] = db_name or os.environ.get("BENCH_DB_NAME", "sender_benchmark")
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    import server
+    return server
+
+
+@asynccontextmanager
+async def running_app(server, drop_database: bool = True):
+    """Run the app's startup/shutdown hooks around an httpx client bound to it."""
+    import httpx
+
+    async with server.app.router.lifespan_context(server.app):
+        if drop_database:
+            await server.db.client.drop_database(server.db.name)
+            await server.ensure_indexes(server.db)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+async def register_user(client, prefix: str = "bench") -> Dict[str, str]:
+    email = f"{prefix}-{uuid.uuid4().hex[:12]}@example.com"
+    password = "BenchPass123!"
+    response = await client.post(
+        "/api/auth/register",
+        json={"email": email, "password": password, "name": prefix},
+    )
+    response.raise_for_status()
+    return {"email": email, "password": password, "token": response.json()["access_token"]}
+
+
+async def seed_user_data(db, user_id: str, accounts: int = 0, jobs: int = 0,
+                         job_age_days: int = 30, batch_size: int = 1000,
+                         min_job_age_days: int = 0, finished_ratio: float = 0.9,
+                         recipients_per_job: int = 100) -> None:
+    """Insert ``accounts`` messaging accounts and ``jobs`` broadcast jobs for a user.
+
+    Jobs are created between ``min_job_age_days`` and ``job_age_days`` ago;
+    ``finished_ratio`` of them are completed, failed or paused. Each job
+    carries ``recipients_per_job`` recipient ids, as real jobs do.
+    """
+    now = datetime.utcnow()
+    batch = []
+    for i in range(accounts):
+        batch.append({
+            "id": str(uuid.uuid4()), "user_id": user_id, "platform": "telegram",
+            "display_name": f"Account {i}", "session_data": {}, "is_active": True,
+            "created_at": now - timedelta(seconds=accounts - i),
+        })
+        if len(batch) == batch_size:
+            await db.messaging_accounts.insert_many(batch)
+            batch = []
+    if batch:
+        await db.messaging_accounts.insert_many(batch)
+
+    statuses = ["pending", "running", "completed", "failed", "paused"]
+    batch = []
+    for i in range(jobs):
+        created = now - timedelta(seconds=random.randint(min_job_age_days * 24 * 3600, job_age_days * 24 * 3600))
+        finished = random.random() < finished_ratio
+        batch.append({
+            "id": str(uuid.uuid4()), "user_id": user_id, "name": f"Job {i}",
+            "account_id": "bench", "platform": "telegram",
+            "template_ids": [str(uuid.uuid4()) for _ in range(random.randint(1, 3))],
+            "recipient_ids": [f"@recipient{i}_{n}" for n in range(recipients_per_job)],
+            "status": random.choice(statuses[2:]) if finished else random.choice(statuses[:2]),
+            "scheduled_at": None, "started_at": created,
+            "completed_at": created + timedelta(minutes=5) if finished else None,
+            "total_recipients": recipients_per_job,
+            "successful_sends": random.randint(0, recipients_per_job),
+            "failed_sends": random.randint(0, 10), "log_count": 0, "created_at": created,
+        })
+        if len(batch) == batch_size:
+            await db.broadcast_jobs.insert_many(batch)
+            batch = []
+    if batch:
+        await db.broadcast_jobs.insert_many(batch)
+
+
+def auth_headers(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples_ms: List[float], elapsed_s: Optional[float] = None) -> Dict[str, Any]:
+    summary = {
+        "count": len(samples_ms),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+    if elapsed_s:
+        summary["req_per_s"] = round(len(samples_ms) / elapsed_s, 2)
+    return summary
+
+
+async def timed(coro) -> float:
+    """Await ``coro`` and return its wall time in milliseconds."""
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000
+
+
+def write_results(path: Optional[str], results: Dict[str, Any]) -> None:
+    print(json.dumps(results, indent=2, default=str))
+    if path:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, default=str)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Local throughput/latency benchmark for the Sender API.
+
+Drives register, login, /auth/me, /dashboard and /accounts with a fixed
+number of concurrent clients and reports req/s and p50/p95/p99 per scenario.
+
+Targets:
+  * in-process (default): server.app through httpx's ASGI transport
+  * --spawn-uvicorn: a local `uvicorn server:app` subprocess (--workers N)
+  * --url: an already running local server
+
+All targets need a local mongod (MONGO_URL). The benchmark database
+(BENCH_DB_NAME) is dropped before in-process and --spawn-uvicorn runs; with
+--url it must be the database that server uses and is left as is. Results
+are written as JSON (--output) and can be compared with a previous run
+(--compare).
+
+    python benchmarks/api_load.py --concurrency 50 --requests 2000 --accounts 200 --jobs 1000
+    python benchmarks/api_load.py --spawn-uvicorn --workers 4 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from _common import (
+    BACKEND_DIR, auth_headers, load_server, register_user, running_app, seed_user_data,
+    summarize, write_results,
+)
+
+SCENARIOS = ["register", "login", "me", "dashboard", "accounts"]
+
+
+async def run_scenario(make_request, concurrency, total):
+    """Issue ``total`` requests from ``concurrency`` workers; return the latency summary."""
+    samples, errors = [], 0
+    issued = 0
+
+    async def worker():
+        nonlocal issued, errors
+        while issued < total:
+            i = issued
+            issued += 1
+            start = time.perf_counter()
+            response = await make_request(i)
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {**summarize(samples, elapsed), "errors": errors}
+
+
+async def prepare_users(client, db, args):
+    users = [await register_user(client, "load") for _ in range(args.users)]
+    for user in users:
+        me = await client.get("/api/auth/me", headers=auth_headers(user["token"]))
+        me.raise_for_status()
+        await seed_user_data(db, me.json()["id"], accounts=args.accounts, jobs=args.jobs)
+    return users
+
+
+async def run_all(client, db, args):
+    users = await prepare_users(client, db, args)
+    scenarios = {
+        "register": lambda i: client.post("/api/auth/register", json={
+            "email": f"load-{uuid.uuid4().hex}@example.com", "password": "BenchPass123!", "name": "load",
+        }),
+        "login": lambda i: client.post("/api/auth/login", json={
+            "email": users[i % len(users)]["email"], "password": users[i % len(users)]["password"],
+        }),
+        "me": lambda i: client.get("/api/auth/me", headers=auth_headers(users[i % len(users)]["token"])),
+        "dashboard": lambda i: client.get("/api/dashboard", headers=auth_headers(users[i % len(users)]["token"])),
+        "accounts": lambda i: client.get("/api/accounts", headers=auth_headers(users[i % len(users)]["token"])),
+    }
+    results = {}
+    for name in args.scenarios:
+        # bcrypt-bound scenarios get a smaller budget so a run stays short
+        total = args.auth_requests if name in ("register", "login") else args.requests
+        await run_scenario(scenarios[name], args.concurrency, min(total, args.warmup))
+        results[name] = await run_scenario(scenarios[name], args.concurrency, total)
+        print(f"{name:>10}: {results[name]['req_per_s']:>9} req/s  p50 {results[name]['p50_ms']} ms  "
+              f"p99 {results[name]['p99_ms']} ms  errors {results[name]['errors']}", file=sys.stderr)
+    return results
+
+
+@asynccontextmanager
+async def external_target(args):
+    """Client and db for a uvicorn subprocess or an already running server."""
+    import httpx
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    mongo_url = os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("AUTH_RATE_LIMIT_ENABLED", "false")
+    db_name = os.environ.get("BENCH_DB_NAME", "sender_benchmark")
+    mongo = AsyncIOMotorClient(mongo_url)
+
+    process = None
+    url = args.url
+    if args.spawn_uvicorn:
+        await mongo.drop_database(db_name)
+        url = f"http://127.0.0.1:{args.port}"
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env={**os.environ, "DB_NAME": db_name},
+        )
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise
+                    await asyncio.sleep(0.2)
+            yield client, mongo[db_name]
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+        mongo.close()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+    print(f"\n{'scenario':>10} {'req/s':>18} {'p50 ms':>18} {'p99 ms':>18}", file=sys.stderr)
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        cells = []
+        for key in ("req_per_s", "p50_ms", "p99_ms"):
+            before, after = baseline[name][key], current[key]
+            delta = (after - before) / before * 100 if before else 0.0
+            cells.append(f"{after:>9} ({delta:+6.1f}%)")
+        print(f"{name:>10} " + " ".join(f"{c:>18}" for c in cells), file=sys.stderr)
+
+
+async def main(args):
+    if args.url or args.spawn_uvicorn:
+        target = "uvicorn" if args.spawn_uvicorn else args.url
+        async with external_target(args) as (client, db):
+            scenarios = await run_all(client, db, args)
+    else:
+        target = "in-process"
+        server = load_server()
+        async with running_app(server) as client:
+            scenarios = await run_all(client, server.db, args)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": target,
+        },
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": scenarios,
+    }
+    write_results(args.output, results)
+    if args.compare:
+        compare(scenarios, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per read scenario")
+    parser.add_argument("--auth-requests", type=int, default=200, help="requests for register/login")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10, help="users the read scenarios rotate through")
+    parser.add_argument("--accounts", type=int, default=50, help="messaging accounts seeded per user")
+    parser.add_argument("--jobs", type=int, default=200, help="broadcast jobs seeded per user")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="benchmark an already running local server")
+    target.add_argument("--spawn-uvicorn", action="store_true", help="start a local uvicorn subprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --spawn-uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    asyncio.run(main(parser.parse_args()))
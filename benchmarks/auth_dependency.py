@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Overhead of the get_current_user dependency with and without the token cache.
+
+The user record is pre-seeded into the user cache, so neither variant touches
+Mongo and the difference is JWT decoding/verification alone. With the cache
+disabled every call runs jwt.decode.
+
+    python benchmarks/auth_dependency.py --iterations 100000
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+from _common import load_server, write_results
+
+
+async def measure(server, credentials, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await server.get_current_user(credentials)
+    return round((time.perf_counter() - start) / iterations * 1e6, 3)
+
+
+async def main(args):
+    server = load_server()
+    user = server.UserProfile(email="bench@example.com", name="bench")
+    server.user_cache.set(user.id, user)
+    token = server.create_access_token(
+        data={"sub": user.id}, expires_delta=timedelta(minutes=server.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    credentials = server.HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    cached = server.token_cache
+    server.token_cache = server.TTLCache(maxsize=0, ttl=0)
+    uncached_us = await measure(server, credentials, args.iterations)
+    server.token_cache = cached
+    cached_us = await measure(server, credentials, args.iterations)
+
+    write_results(args.output, {
+        "iterations": args.iterations,
+        "without_token_cache_us_per_call": uncached_us,
+        "with_token_cache_us_per_call": cached_us,
+        "speedup": round(uncached_us / cached_us, 2) if cached_us else None,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Dashboard query latency: four serial queries vs. the current concurrent ones.
+
+Seeds a user with --jobs broadcast jobs and --accounts accounts, then times
+the previous serial implementation ("before") against the current
+get_dashboard_stats ("after"), both called directly so only Mongo work is
+measured. The response cache is bypassed. Both use index-bounded queries, so
+neither should grow with --jobs.
+
+    python benchmarks/dashboard_facet.py --jobs 100000 --iterations 200
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from starlette.requests import Request
+
+from _common import load_server, register_user, running_app, seed_user_data, summarize, timed, write_results
+
+
+async def serial_dashboard(server, user_id):
+    """The original dashboard: four round-trips, one after another."""
+    db = server.db
+    await db.messaging_accounts.count_documents({"user_id": user_id, "is_active": True})
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    await db.broadcast_jobs.aggregate([
+        {"$match": {"user_id": user_id, "started_at": {"$gte": today}}},
+        {"$group": {"_id": None, "total_successful": {"$sum": "$successful_sends"},
+                    "total_failed": {"$sum": "$failed_sends"}}},
+    ]).to_list(1)
+    await db.broadcast_jobs.count_documents(
+        {"user_id": user_id, "status": {"$in": ["pending", "running"]}}
+    )
+    await db.broadcast_jobs.find({"user_id": user_id}).sort("created_at", -1).limit(10).to_list(10)
+
+
+async def main(args):
+    server = load_server()
+    async with running_app(server) as client:
+        user = await register_user(client, "dashboard")
+        profile = await server.get_current_user(server.HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=user["token"]
+        ))
+        await seed_user_data(server.db, profile.id, accounts=args.accounts, jobs=args.jobs,
+                             recipients_per_job=args.recipients)
+
+        before = [await timed(serial_dashboard(server, profile.id)) for _ in range(args.iterations)]
+        dashboard = server.get_dashboard_stats.__wrapped__
+        request = Request({"type": "http", "method": "GET", "headers": []})
+        after = [await timed(dashboard(request=request, current_user=profile)) for _ in range(args.iterations)]
+
+    write_results(args.output, {
+        "jobs": args.jobs,
+        "accounts": args.accounts,
+        "before_serial": summarize(before),
+        "after_concurrent": summarize(after),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--recipients", type=int, default=100, help="recipient ids stored per job")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(main(parser.parse_args()))
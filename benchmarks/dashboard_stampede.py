@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Concurrent dashboard refreshes from one user: uncached vs. single-flight cache.
+
+Seeds a user with --jobs broadcast jobs, then fires --tabs concurrent
+get_dashboard_stats calls per burst. "before" calls the undecorated route, so
+every tab runs the full query set; "after" goes through the response cache,
+whose entries are invalidated before each burst so every burst is a cold
+miss that the tabs share.
+
+    python benchmarks/dashboard_stampede.py --tabs 20 --bursts 50
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.requests import Request
+
+from _common import load_server, register_user, running_app, seed_user_data, summarize, write_results
+
+
+async def burst(route, request, profile, tabs):
+    start = time.perf_counter()
+    await asyncio.gather(*(route(request=request, current_user=profile) for _ in range(tabs)))
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(args):
+    server = load_server()
+    async with running_app(server) as client:
+        user = await register_user(client, "stampede")
+        profile = await server.get_current_user(server.HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=user["token"]
+        ))
+        await seed_user_data(server.db, profile.id, accounts=args.accounts, jobs=args.jobs)
+        request = Request({"type": "http", "method": "GET", "headers": []})
+
+        uncached = server.get_dashboard_stats.__wrapped__
+        before = [await burst(uncached, request, profile, args.tabs) for _ in range(args.bursts)]
+
+        after = []
+        for _ in range(args.bursts):
+            server.response_cache.invalidate_user(profile.id)
+            after.append(await burst(server.get_dashboard_stats, request, profile, args.tabs))
+
+    write_results(args.output, {
+        "jobs": args.jobs,
+        "tabs": args.tabs,
+        "before_uncached_burst": summarize(before),
+        "after_single_flight_burst": summarize(after),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--tabs", type=int, default=20)
+    parser.add_argument("--bursts", type=int, default=50)
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Dashboard latency with a large job history, before and after archival.
+
+Seeds one user with --historical finished jobs older than the retention
+period and --live recent jobs, times get_dashboard_stats (response cache
+bypassed), runs one JobArchiver pass and times the dashboard again, now
+that broadcast_jobs only holds the live set.
+
+    python benchmarks/job_archive.py --historical 1000000 --live 500
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.requests import Request
+
+from _common import load_server, register_user, running_app, seed_user_data, summarize, timed, write_results
+
+
+async def measure(server, profile, iterations):
+    dashboard = server.get_dashboard_stats.__wrapped__
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    await dashboard(request=request, current_user=profile)
+    return summarize([await timed(dashboard(request=request, current_user=profile)) for _ in range(iterations)])
+
+
+async def main(args):
+    server = load_server()
+    async with running_app(server) as client:
+        # Only the explicit pass below may archive
+        await server.job_archiver.stop()
+        user = await register_user(client, "archive")
+        profile = await server.get_current_user(server.HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=user["token"]
+        ))
+        retention = server.job_archiver.retention_days
+        await seed_user_data(server.db, profile.id, jobs=args.historical, finished_ratio=1.0,
+                             min_job_age_days=retention + 1, job_age_days=retention + 365,
+                             recipients_per_job=args.recipients, batch_size=args.batch_size)
+        await seed_user_data(server.db, profile.id, accounts=args.accounts, jobs=args.live,
+                             job_age_days=min(retention, 30), recipients_per_job=args.recipients,
+                             batch_size=args.batch_size)
+
+        before = await measure(server, profile, args.iterations)
+        start = time.perf_counter()
+        moved = await server.job_archiver.archive_once()
+        archive_s = time.perf_counter() - start
+        after = await measure(server, profile, args.iterations)
+        live = await server.db.broadcast_jobs.count_documents({"user_id": profile.id})
+
+    write_results(args.output, {
+        "historical_jobs": args.historical,
+        "live_jobs_seeded": args.live,
+        "retention_days": retention,
+        "archived": moved,
+        "archive_pass_s": round(archive_s, 2),
+        "live_jobs_after": live,
+        "before_dashboard": before,
+        "after_dashboard": after,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--historical", type=int, default=1000000)
+    parser.add_argument("--live", type=int, default=500)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--recipients", type=int, default=20,
+                        help="recipient ids stored per job (keeps 1M jobs within a few GB)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5000, help="insert batch size while seeding")
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+/api/dashboard latency during a login storm.
+
+Runs concurrent login loops against the in-process app while a single client
+polls /api/dashboard, and reports the dashboard latency distribution. With
+--mode both the run is repeated with bcrypt executed inline on the event loop
+(the pre-offload behaviour) for comparison.
+
+    python benchmarks/login_storm.py --login-concurrency 32 --duration 15
+"""
+import argparse
+import asyncio
+import time
+
+from _common import auth_headers, load_server, register_user, running_app, summarize, timed, write_results
+
+
+async def _inline_password_hashing(func, *args):
+    return func(*args)
+
+
+async def run_storm(server, args) -> dict:
+    async with running_app(server) as client:
+        users = [await register_user(client, "storm") for _ in range(args.users)]
+        poller = await register_user(client, "poller")
+        stop = asyncio.Event()
+        login_ms, dashboard_ms = [], []
+
+        async def login_loop(i):
+            user = users[i % len(users)]
+            while not stop.is_set():
+                login_ms.append(await timed(client.post(
+                    "/api/auth/login",
+                    json={"email": user["email"], "password": user["password"]},
+                )))
+
+        async def dashboard_loop():
+            headers = auth_headers(poller["token"])
+            while not stop.is_set():
+                dashboard_ms.append(await timed(client.get("/api/dashboard", headers=headers)))
+                await asyncio.sleep(args.poll_interval)
+
+        tasks = [asyncio.create_task(login_loop(i)) for i in range(args.login_concurrency)]
+        tasks.append(asyncio.create_task(dashboard_loop()))
+        start = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {"dashboard": summarize(dashboard_ms), "login": summarize(login_ms, elapsed)}
+
+
+async def main(args):
+    server = load_server()
+    results = {
+        "password_hash_workers": server.PASSWORD_HASH_WORKERS,
+        "login_concurrency": args.login_concurrency,
+        "duration_s": args.duration,
+    }
+    offloaded = server.run_password_hashing
+    modes = ["offloaded", "inline"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        server.run_password_hashing = offloaded if mode == "offloaded" else _inline_password_hashing
+        results[mode] = await run_storm(server, args)
+    server.run_password_hashing = offloaded
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--mode", choices=["offloaded", "inline", "both"], default="both")
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Multi-worker smoke test and scaling check.
+
+Starts `uvicorn server:app --workers N` for each --workers value, drives the
+chosen api_load.py scenarios against it and reports req/s per worker count
+and the speedup over the first count. Every worker opens its own Mongo client
+in the lifespan handler; any failed request (e.g. a client shared across a
+fork) makes the script exit with status 1.
+
+    python benchmarks/multi_worker.py --workers 1 4 --scenarios login dashboard
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from _common import write_results
+from api_load import SCENARIOS, external_target, run_all
+
+
+async def measure(args, workers):
+    run_args = argparse.Namespace(**{**vars(args), "workers": workers, "spawn_uvicorn": True, "url": None})
+    async with external_target(run_args) as (client, db):
+        return await run_all(client, db, run_args)
+
+
+async def main(args):
+    runs = {}
+    for workers in args.workers:
+        print(f"--- {workers} worker(s)", file=sys.stderr)
+        runs[workers] = await measure(args, workers)
+
+    baseline = runs[args.workers[0]]
+    results = {"cpu_count": os.cpu_count(), "workers": {}}
+    failed = False
+    for workers, scenarios in runs.items():
+        results["workers"][workers] = {
+            name: {
+                "req_per_s": summary["req_per_s"],
+                "p99_ms": summary["p99_ms"],
+                "errors": summary["errors"],
+                "speedup": round(summary["req_per_s"] / baseline[name]["req_per_s"], 2)
+                if baseline[name]["req_per_s"] else None,
+            }
+            for name, summary in scenarios.items()
+        }
+        failed = failed or any(summary["errors"] for summary in scenarios.values())
+    write_results(args.output, results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=["login", "dashboard"])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per read scenario")
+    parser.add_argument("--auth-requests", type=int, default=400, help="requests for register/login")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write JSON results to this file")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Login throughput per core at each bcrypt cost (no database).
+
+A login costs one bcrypt verify, so for every cost in --rounds this runs
+verify() in --threads threads for --duration seconds and reports verifies/s
+overall and per core. It also prints the cost that server.py's startup
+calibration would pick for --target-ms on this machine.
+
+    python benchmarks/password_cost.py --rounds 10 11 12 13 --duration 5
+"""
+import argparse
+import os
+import threading
+import time
+
+from _common import load_server, write_results
+
+
+def measure(hasher, threads, duration):
+    stored = hasher.hash("BenchPass123!")
+    counts = [0] * threads
+    deadline = time.perf_counter() + duration
+
+    def worker(i):
+        while time.perf_counter() < deadline:
+            hasher.verify("BenchPass123!", stored)
+            counts[i] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed
+
+
+def main(args):
+    server = load_server()
+    from passlib.hash import bcrypt
+    from password_hashing import bcrypt_hash_seconds, calibrate_bcrypt_rounds
+
+    cores = min(args.threads, os.cpu_count() or 1)
+    results = {
+        "threads": args.threads,
+        "cpu_count": os.cpu_count(),
+        "target_ms": args.target_ms,
+        "calibrated_rounds": calibrate_bcrypt_rounds(
+            args.target_ms / 1000, server.PASSWORD_HASH_MIN_ROUNDS, server.PASSWORD_HASH_MAX_ROUNDS
+        ),
+        "costs": {},
+    }
+    for rounds in args.rounds:
+        logins_per_s = measure(bcrypt.using(rounds=rounds), args.threads, args.duration)
+        results["costs"][rounds] = {
+            "hash_ms": round(bcrypt_hash_seconds(rounds) * 1000, 2),
+            "logins_per_s": round(logins_per_s, 2),
+            "logins_per_s_per_core": round(logins_per_s / cores, 2),
+        }
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13, 14])
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per cost")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    main(parser.parse_args())
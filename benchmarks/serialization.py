@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Response serialization cost for /api/accounts and /api/dashboard payloads.
+
+Compares FastAPI's default path (build models, re-validate through
+response_model / jsonable_encoder, render with the stdlib encoder) against
+FastJSONResponse (build models once, render with orjson) at several item
+counts. No database is touched; documents are generated in memory.
+
+    python benchmarks/serialization.py --sizes 10 100 1000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+from _common import load_server, summarize, write_results
+
+
+def account_docs(server, n):
+    user_id = str(uuid.uuid4())
+    return [
+        server.MessagingAccount(
+            user_id=user_id, platform="whatsapp", display_name=f"Account {i}",
+            session_data={"cookies": {"k": "v" * 32}, "index": i},
+        ).dict()
+        for i in range(n)
+    ]
+
+
+def job_docs(server, n):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()), "name": f"Job {i}", "account_id": str(uuid.uuid4()),
+            "platform": "telegram", "status": "completed", "started_at": now,
+            "completed_at": now, "total_recipients": 100, "successful_sends": 90,
+            "failed_sends": 10, "created_at": now,
+        }
+        for i in range(n)
+    ]
+
+
+async def measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def main(args):
+    server = load_server()
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    accounts_field = create_response_field(name="accounts", type_=List[server.MessagingAccount])
+    results = {"iterations": args.iterations, "accounts": {}, "dashboard": {}}
+
+    for size in args.sizes:
+        accounts = account_docs(server, size)
+        jobs = job_docs(server, size)
+
+        async def accounts_default():
+            models = [server.MessagingAccount(**doc) for doc in accounts]
+            content = await serialize_response(field=accounts_field, response_content=models)
+            JSONResponse(content)
+
+        async def accounts_fast():
+            server.FastJSONResponse([server.MessagingAccount(**doc) for doc in accounts])
+
+        def dashboard_payload():
+            return {
+                "active_accounts": size,
+                "messages_today": {"successful": 1, "failed": 0},
+                "active_jobs": 1,
+                "recent_jobs": [server.JobSummary(**job) for job in jobs],
+            }
+
+        async def dashboard_default():
+            JSONResponse(jsonable_encoder(dashboard_payload()))
+
+        async def dashboard_fast():
+            server.FastJSONResponse(dashboard_payload())
+
+        results["accounts"][size] = {
+            "default": await measure(accounts_default, args.iterations),
+            "fast": await measure(accounts_fast, args.iterations),
+        }
+        results["dashboard"][size] = {
+            "default": await measure(dashboard_default, args.iterations),
+            "fast": await measure(dashboard_fast, args.iterations),
+        }
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from cache import ResponseCache, cached_response
+
+ETAG = 'W/"v1"'
+
+
+class User:
+    def __init__(self, user_id="u1"):
+        self.id = user_id
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def counting_route(cache, delay=0.01, **decorator_kwargs):
+    calls = []
+
+    @cached_response(cache, "test", **decorator_kwargs)
+    async def route(request, current_user, page=None):
+        calls.append(page)
+        await asyncio.sleep(delay)
+        if request.headers.get("if-none-match") == ETAG:
+            return Response(status_code=304, headers={"ETag": ETAG})
+        return Response(f"page {page}".encode(), headers={"ETag": ETAG})
+
+    return route, calls
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    route, calls = counting_route(cache)
+
+    async def run():
+        return await asyncio.gather(*(route(request=make_request(), current_user=User()) for _ in range(10)))
+
+    responses = asyncio.run(run())
+    assert len(calls) == 1
+    assert {r.status_code for r in responses} == {200}
+    assert len({id(r) for r in responses}) == 1
+
+
+def test_hit_is_served_from_cache_and_answers_matching_etag_with_304():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    route, calls = counting_route(cache)
+
+    async def run():
+        first = await route(request=make_request(), current_user=User())
+        hit = await route(request=make_request(), current_user=User())
+        conditional = await route(request=make_request(ETAG), current_user=User())
+        return first, hit, conditional
+
+    first, hit, conditional = asyncio.run(run())
+    assert len(calls) == 1
+    assert hit is first
+    assert conditional.status_code == 304
+
+
+def test_leader_304_is_not_shared_with_unconditional_requests():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    route, calls = counting_route(cache)
+
+    async def run():
+        return await asyncio.gather(
+            route(request=make_request(ETAG), current_user=User()),
+            route(request=make_request(), current_user=User()),
+        )
+
+    conditional, unconditional = asyncio.run(run())
+    assert conditional.status_code == 304
+    assert unconditional.status_code == 200
+    assert len(calls) == 2
+
+
+def test_vary_params_and_users_get_separate_entries():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    route, calls = counting_route(cache, vary=("page",))
+
+    async def run():
+        await route(request=make_request(), current_user=User("u1"), page=1)
+        await route(request=make_request(), current_user=User("u1"), page=2)
+        await route(request=make_request(), current_user=User("u2"), page=1)
+        await route(request=make_request(), current_user=User("u1"), page=1)
+
+    asyncio.run(run())
+    assert calls == [1, 2, 1]
+
+
+def test_invalidate_user_drops_only_that_users_entries():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    route, calls = counting_route(cache)
+
+    async def run():
+        await route(request=make_request(), current_user=User("u1"))
+        await route(request=make_request(), current_user=User("u2"))
+        cache.invalidate_user("u1")
+        await route(request=make_request(), current_user=User("u1"))
+        await route(request=make_request(), current_user=User("u2"))
+
+    asyncio.run(run())
+    assert len(calls) == 3
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_compute("k", failing) for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", failing)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+
+
+def test_waiters_retry_when_the_leader_is_cancelled():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    started = []
+
+    async def compute():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def run():
+        leader = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await waiter == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(run())
+    assert len(started) == 2
+
+
+def test_streaming_and_error_responses_are_not_cached():
+    cache = ResponseCache(maxsize=100, ttl=60)
+    calls = []
+
+    @cached_response(cache, "stream")
+    async def route(request, current_user, kind):
+        calls.append(kind)
+        if kind == "stream":
+            return StreamingResponse(iter([b"x"]))
+        return Response(status_code=404)
+
+    async def run():
+        for kind in ("stream", "stream", "missing", "missing"):
+            await route(request=make_request(), current_user=User(), kind=kind)
+
+    asyncio.run(run())
+    assert len(calls) == 4
+
+
+def test_generations_are_forgotten_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = ResponseCache(maxsize=100, ttl=2)
+
+    cache.invalidate_user("u1")
+    first_key = cache.key("test", "u1")
+    now[0] += 1
+    cache.invalidate_user("u2")
+    assert len(cache._generations) == 2
+
+    now[0] += 1.5
+    cache.invalidate_user("u3")
+    assert list(cache._generations) == ["u2", "u3"]
+    # Generations are never reused, so a stale key cannot come back
+    cache.invalidate_user("u1")
+    assert cache.key("test", "u1") != first_key
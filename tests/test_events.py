@@ -0,0 +1,76 @@
+import asyncio
+
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from events import ChangeFeed
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length):
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def find(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise AutoReconnect("connection reset")
+        return FakeCursor([])
+
+
+class StandaloneDB:
+    """A standalone mongod: no change streams, and user_versions fails once."""
+
+    def __init__(self):
+        self.user_versions = FakeCollection(failures=1)
+        self.broadcast_jobs = FakeCollection()
+        self.messaging_accounts = FakeCollection()
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+
+def test_polling_survives_driver_errors():
+    db = StandaloneDB()
+    feed = ChangeFeed(db, poll_interval=0.01)
+
+    async def run():
+        feed.subscribe("u1")
+        feed.start()
+        await asyncio.sleep(0.2)
+        task = feed._task
+        await feed.stop()
+        return task
+
+    task = asyncio.run(run())
+    assert feed.mode == "polling"
+    assert task.cancelled()
+    assert db.user_versions.calls > 2
+
+
+def test_stop_tolerates_a_failed_task():
+    feed = ChangeFeed(StandaloneDB())
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def run():
+        feed._task = asyncio.create_task(broken())
+        await asyncio.sleep(0)
+        await feed.stop()
+
+    asyncio.run(run())
+    assert feed._task is None
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from bson.int64 import Int64
+
+from mongo_monitoring import MongoCommandListener, mongo_command_duration
+
+
+class Events:
+    def __init__(self, listener):
+        self.listener = listener
+        self.request_id = 0
+
+    def run(self, name, command, reply, duration_ms):
+        self.request_id += 1
+        common = {"command_name": name, "connection_id": ("db", 27017), "request_id": self.request_id}
+        self.listener.started(SimpleNamespace(**common, database_name="sender", command=command))
+        self.listener.succeeded(SimpleNamespace(**common, reply=reply, duration_micros=int(duration_ms * 1000)))
+
+
+def getmore_count():
+    with mongo_command_duration._lock:
+        state = mongo_command_duration._values.get(("$cmd.aggregate", "getMore"))
+    return int(state[-1]) if state else 0
+
+
+def test_change_stream_getmores_are_not_slow_ops():
+    listener = MongoCommandListener(slow_ms=100)
+    events = Events(listener)
+    before = getmore_count()
+
+    events.run("aggregate", {"aggregate": 1, "pipeline": [{"$changeStream": {}}, {"$match": {}}]},
+               {"cursor": {"id": Int64(42), "firstBatch": []}}, duration_ms=5)
+    for _ in range(5):
+        events.run("getMore", {"getMore": Int64(42), "collection": "$cmd.aggregate"},
+                   {"cursor": {"id": Int64(42), "nextBatch": []}}, duration_ms=1000)
+
+    assert listener.recorder.recent() == []
+    assert getmore_count() == before
+
+
+def test_ordinary_slow_getmore_is_still_recorded():
+    listener = MongoCommandListener(slow_ms=100)
+    events = Events(listener)
+
+    events.run("find", {"find": "broadcast_jobs", "filter": {}},
+               {"cursor": {"id": Int64(7), "firstBatch": []}}, duration_ms=5)
+    events.run("getMore", {"getMore": Int64(7), "collection": "broadcast_jobs"},
+               {"cursor": {"id": Int64(0), "nextBatch": [{}]}}, duration_ms=250)
+
+    slow = listener.recorder.recent()
+    assert [op["command"] for op in slow] == ["getMore"]
+
+
+def test_closed_change_stream_cursor_is_forgotten():
+    listener = MongoCommandListener(slow_ms=100)
+    events = Events(listener)
+
+    events.run("aggregate", {"aggregate": 1, "pipeline": [{"$changeStream": {}}]},
+               {"cursor": {"id": Int64(9), "firstBatch": []}}, duration_ms=5)
+    events.run("killCursors", {"killCursors": "$cmd.aggregate", "cursors": [Int64(9)]}, {"ok": 1}, duration_ms=1)
+
+    assert listener._await_cursors == set()
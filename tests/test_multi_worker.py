@@ -0,0 +1,54 @@
+import importlib
+import sys
+
+from database import MongoSettings
+
+
+def test_server_import_opens_no_mongo_client(monkeypatch):
+    # Workers fork after import, so importing must not create a client or pool
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    monkeypatch.delenv("DB_NAME", raising=False)
+    sys.modules.pop("server", None)
+    server = importlib.import_module("server")
+    assert server.client is None
+    assert server.db is None
+    assert server.change_feed is None
+    assert server.password_hash_executor is None
+    assert server.app.router.lifespan_context is server.lifespan
+
+
+def test_settings_from_env_map_to_client_options(monkeypatch):
+    monkeypatch.setenv("MONGO_URL", "mongodb://db.example:27017")
+    monkeypatch.setenv("DB_NAME", "sender")
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "25")
+    monkeypatch.setenv("MONGO_MIN_POOL_SIZE", "5")
+    monkeypatch.setenv("MONGO_MAX_IDLE_TIME_MS", "60000")
+    monkeypatch.setenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "1000")
+    monkeypatch.setenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000")
+    monkeypatch.setenv("MONGO_CONNECT_TIMEOUT_MS", "2000")
+    monkeypatch.setenv("MONGO_SOCKET_TIMEOUT_MS", "10000")
+
+    settings = MongoSettings.from_env()
+
+    assert settings.url == "mongodb://db.example:27017"
+    assert settings.db_name == "sender"
+    assert settings.client_options() == {
+        "maxPoolSize": 25,
+        "minPoolSize": 5,
+        "maxIdleTimeMS": 60000,
+        "waitQueueTimeoutMS": 1000,
+        "serverSelectionTimeoutMS": 3000,
+        "connectTimeoutMS": 2000,
+        "socketTimeoutMS": 10000,
+    }
+
+
+def test_unset_timeouts_keep_driver_defaults(monkeypatch):
+    monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+    monkeypatch.setenv("DB_NAME", "sender")
+    for name in ("MONGO_MAX_POOL_SIZE", "MONGO_MIN_POOL_SIZE", "MONGO_MAX_IDLE_TIME_MS",
+                 "MONGO_WAIT_QUEUE_TIMEOUT_MS", "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+                 "MONGO_CONNECT_TIMEOUT_MS", "MONGO_SOCKET_TIMEOUT_MS"):
+        monkeypatch.delenv(name, raising=False)
+
+    assert MongoSettings.from_env().client_options() == {"maxPoolSize": 100, "minPoolSize": 0}
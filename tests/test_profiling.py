@@ -0,0 +1,22 @@
+import threading
+import time
+
+from profiling import StackSampler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stop_returns_samples_and_discards_later_ones():
+    sampler = StackSampler(threading.get_ident(), interval=0.005)
+    sampler.start()
+    busy(0.1)
+    samples = sampler.stop()
+    assert sum(samples.values()) >= 1
+    assert any("busy" in frame for stack in samples for frame in stack)
+
+    busy(0.12)
+    assert sampler.samples == samples
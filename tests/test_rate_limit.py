@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from rate_limit import BucketRule, InMemoryBackend, TokenBucketLimiter
+
+
+def test_bucket_allows_burst_then_reports_retry_after():
+    limiter = TokenBucketLimiter(InMemoryBackend(), {"ip": BucketRule(capacity=2, refill_per_second=1)})
+
+    async def run():
+        return [await limiter.check([("ip", "10.0.0.1")]) for _ in range(3)]
+
+    decisions = asyncio.run(run())
+    assert [d.allowed for d in decisions] == [True, True, False]
+    assert 0 < decisions[-1].retry_after <= 1
+
+
+def test_keys_without_a_value_are_skipped():
+    limiter = TokenBucketLimiter(InMemoryBackend(), {"ip": BucketRule(capacity=1, refill_per_second=1)})
+
+    async def run():
+        return [await limiter.check([("ip", None)]) for _ in range(3)]
+
+    assert all(d.allowed for d in asyncio.run(run()))
+
+
+@pytest.mark.parametrize("capacity, refill", [(5, 0), (5, -1), (0, 1)])
+def test_invalid_rules_are_rejected(capacity, refill):
+    with pytest.raises(ValueError):
+        BucketRule(capacity=capacity, refill_per_second=refill)